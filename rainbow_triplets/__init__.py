@@ -0,0 +1,8 @@
+# Rdzeń gry bez zależności od Qt: plansza, reguły, detektory i silniki AI.
+# Interfejs graficzny jest w rainbow_triplets.gui i importuje PyQt5 dopiero przy użyciu.
+from .bitboard import Board, bits_to_cells
+from .forbidden import IndexedBoard
+from .zobrist import TranspositionTable
+from .mcts import MCTS, MCTSNode, NodePool
+from .solver import Solver, solve
+from .ai import AI_MODES, choose_move
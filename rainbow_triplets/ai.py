@@ -0,0 +1,178 @@
+import functools
+import random
+import time
+
+from .forbidden import IndexedBoard
+from .heuristic import HeuristicEngine
+from .instrument import MoveStats, counting_copy
+from .mcts import MCTS
+from .solver import Solver
+from .zobrist import TranspositionTable
+
+# MCTS z oceną liści siecią z evaluator.py zamiast symulacji (NumPy i wytrenowany model, domyślnie evaluator.npz).
+EVAL_MODE = "mcts-siec"
+AI_MODES = ("losowy", "heurystyczny", "mcts", "perfekcyjny", EVAL_MODE)
+MCTS_ITERATIONS = 1000
+# Gdy zostaje tyle pustych pól, MCTS oddaje ruch solverowi (jeśli ten zdąży policzyć dokładny wynik).
+ENDGAME_CELLS = 14
+ENDGAME_MAX_NODES = 100000
+SOLVER_TIME_LIMIT = 5.0
+# Tablica transpozycji silnika partii: pozycje równoważne (także lustrzane) dzielą statystyki MCTS.
+# Koszt tablicy mieści się w rozrzucie pomiaru: mediana iteracji/s z 7 przeplatanych wyszukiwań po 1 s
+# różni się od MCTS bez tablicy o -0,7% (n=10), -2,4% (n=30) i +3,5% (n=100).
+TABLE_CAPACITY = 1 << 18
+
+
+def color(turn_index):
+    return turn_index % 3
+
+
+def new_mcts_engine(max_nodes=None):
+    # Silnik MCTS na całą partię (GUI, CLI, turniej): drzewo przesuwane advance(), statystyki w tablicy transpozycji.
+    return MCTS(table=TranspositionTable(TABLE_CAPACITY), smart_rollouts=True, rave=True, widening=True,
+                max_nodes=max_nodes)
+
+
+@functools.lru_cache(maxsize=4)
+def load_evaluator(path=None):
+    # import na żądanie: evaluator ładuje NumPy, którego pozostałe tryby nie potrzebują
+    from .evaluator import MODEL_PATH, Evaluator
+    return Evaluator.load(path or MODEL_PATH)
+
+
+def new_eval_engine(weights=None, max_nodes=None):
+    # Odpowiednik new_mcts_engine dla trybu EVAL_MODE; weights — plik modelu (evaluator.py train --out).
+    from .evaluator import EvaluatorMCTS
+    return EvaluatorMCTS(load_evaluator(weights), table=TranspositionTable(TABLE_CAPACITY), max_nodes=max_nodes)
+
+
+def random_move(board, turn):
+    return random.choice(board.empty_cells())
+
+
+def heuristic_move(board, turn, table=None, engine=None, stats=None):
+    # 1. odrzucamy ruchy natychmiast przegrywające, 2. minimalizujemy bezpieczne odpowiedzi gracza
+    # table (TranspositionTable) pamięta liczbę bezpiecznych odpowiedzi dla pozycji i jej odbicia;
+    # engine (HeuristicEngine) liczy to samo przyrostowo, z pamięcią między turami partii
+    if isinstance(engine, HeuristicEngine):
+        move = engine.choose(board, turn)
+        if stats is not None:
+            stats.add_heuristic(engine)
+        return move
+    code, next_code = color(turn), color(turn + 1)
+    index = board if isinstance(board, IndexedBoard) else IndexedBoard.from_board(board)
+    candidates = index.safe_cells(code) or index.empty_cells()
+    best, min_opts = [], None
+    for m in candidates:
+        index.make(m, code)
+        future_safe = None if table is None else table.get(index.canonical_key())
+        if future_safe is None:
+            future_safe = index.safe_count(next_code)
+            if table is not None:
+                table.put(index.canonical_key(), future_safe)
+        index.undo(m)
+        if min_opts is None or future_safe < min_opts:
+            min_opts = future_safe
+            best = [m]
+        elif future_safe == min_opts:
+            best.append(m)
+    if stats is not None and table is not None:
+        stats.add_table(table)
+    return random.choice(best)
+
+
+def mcts_move(board, turn, iterations=None, time_limit=None, should_stop=None, workers=1, engine=None,
+              table=None, stats=None):
+    if iterations is None and time_limit is None:
+        iterations = MCTS_ITERATIONS
+    if board.empty_mask().bit_count() <= ENDGAME_CELLS:
+        solver = Solver(max_nodes=ENDGAME_MAX_NODES, time_limit=time_limit, should_stop=should_stop)
+        value, move, exact = solve_position(solver, board, turn, stats)
+        if exact:
+            return move
+    if engine is None:
+        if workers > 1:
+            # import na żądanie: parallel_mcts ładuje multiprocessing, którego zwykły ruch nie potrzebuje
+            from .parallel_mcts import RootParallelMCTS
+            engine = RootParallelMCTS(workers)
+        elif table is not None:
+            engine = MCTS(table=table, smart_rollouts=True, rave=True, widening=True)
+        else:
+            engine = new_mcts_engine()
+    profile = stats is not None and isinstance(engine, MCTS)
+    if profile:
+        engine.profile = True
+    try:
+        move = engine.search(board, turn, iterations, time_limit, should_stop)
+    finally:
+        if profile:
+            engine.profile = False
+    if profile:
+        stats.add_search(engine.stats)
+        if engine.table is not None:
+            stats.add_table(engine.table)
+        if engine.pool is not None:
+            stats.add_tree(engine)
+    return move if move is not None else random_move(board, turn)
+
+
+def perfect_move(board, turn, time_limit=None, should_stop=None, stats=None):
+    solver = Solver(time_limit=time_limit or SOLVER_TIME_LIMIT, should_stop=should_stop)
+    value, move, exact = solve_position(solver, board, turn, stats)
+    return move if move is not None else random_move(board, turn)
+
+
+def solve_position(solver, board, turn, stats=None):
+    if stats is None:
+        return solver.solve(board, turn)
+    board = counting_copy(board)
+    type(board).calls = 0
+    value, move, exact = solver.solve(board, turn)
+    stats.add_solver(solver, exact, type(board).calls)
+    stats.add_table(solver.table)
+    return value, move, exact
+
+
+def book_move(book, board):
+    # Tylko wpisy dokładne: przy limicie solvera księga zawiera też oceny z przeszukiwania z ograniczoną głębokością,
+    # które nie mogą zastępować silnika (probe nadal je pokazuje).
+    hit = book.lookup(board)
+    if hit is None or not hit[2] or hit[1] is None or not board.is_empty(hit[1]):
+        return None
+    return hit[1]
+
+
+def choose_move(board, turn, ai_mode, iterations=None, time_limit=None, should_stop=None, workers=1, engine=None,
+                table=None, book=None, instrumentation=None):
+    # instrumentation (Instrumentation): po ruchu dostaje MoveStats; bez niej ruch liczony jest bez żadnych pomiarów.
+    if instrumentation is None:
+        return select_move(board, turn, ai_mode, iterations, time_limit, should_stop, workers, engine, table, book)
+    stats = MoveStats(ai_mode, board.size, turn)
+    start = time.perf_counter()
+    move = select_move(board, turn, ai_mode, iterations, time_limit, should_stop, workers, engine, table, book,
+                       stats)
+    stats.wall_time = time.perf_counter() - start
+    stats.move = move
+    instrumentation.emit(stats)
+    return move
+
+
+def select_move(board, turn, ai_mode, iterations=None, time_limit=None, should_stop=None, workers=1, engine=None,
+                table=None, book=None, stats=None):
+    if not board.empty_mask():
+        return None
+    if ai_mode == "losowy":
+        return random_move(board, turn)
+    if book is not None:
+        move = book_move(book, board)
+        if move is not None:
+            if stats is not None:
+                stats.engine = "book"
+            return move
+    if ai_mode == "heurystyczny":
+        return heuristic_move(board, turn, table, engine, stats)
+    if ai_mode == "perfekcyjny":
+        return perfect_move(board, turn, time_limit, should_stop, stats)
+    if ai_mode == EVAL_MODE and engine is None:
+        engine = new_eval_engine()
+    return mcts_move(board, turn, iterations, time_limit, should_stop, workers, engine, table, stats)
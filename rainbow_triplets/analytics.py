@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .forbidden import IndexedBoard
+from .parallel_mcts import default_workers
+
+# Wynik pozycji (z perspektywy gracza na ruchu): (wartość przy grze doskonałej: 1 / 0 / -1,
+# liczba kolejności ruchów kończących się remisem, losses) — losses[j] to liczba kolejności, w których
+# tęczowy ciąg powstaje w (j + 1)-szym ruchu od tej pozycji. Liczba ruchów wykonanych jest zapisana w samej
+# pozycji, więc klucz kanoniczny (z odbiciem lustrzanym) wystarcza do zapamiętania wyniku.
+MEMO_LIMIT = 2_000_000
+CHECKPOINT_VERSION = 1
+VALUE_NAMES = {1: "wygrywa", 0: "remis", -1: "przegrywa"}
+
+# pamięć wyników w procesie puli; wspólna dla zadań tej samej planszy, bo poddrzewa różnych prefiksów się pokrywają
+_memo = {}
+_memo_size = None
+
+
+class Counters:
+    __slots__ = ('computed', 'hits')
+
+    def __init__(self):
+        self.computed = 0
+        self.hits = 0
+
+
+def explore(board, turn, memo, counters, memo_limit=MEMO_LIMIT):
+    # Wszystkie kolejności ruchów od pozycji. Ruch na polu zakazanym dla koloru kończy partię od razu,
+    # więc takie pola są tylko liczone (losses[0]), a rekurencja schodzi wyłącznie w ruchy bezpieczne.
+    key = board.canonical_key()
+    result = memo.get(key)
+    if result is not None:
+        counters.hits += 1
+        return result
+    code = turn % 3
+    counts = board.counts[code]
+    empties = board.empty_cells()
+    remaining = len(empties)
+    losses = [0] * remaining
+    losses[0] = remaining - board.safe[code]
+    draws = 0
+    best = -1
+    for m in empties:
+        if counts[m]:
+            continue
+        if remaining == 1:
+            draws += 1
+            best = max(best, 0)
+            continue
+        board.make(m, code)
+        value, child_draws, child_losses = explore(board, turn + 1, memo, counters, memo_limit)
+        board.undo(m)
+        best = max(best, -value)
+        draws += child_draws
+        for j, count in enumerate(child_losses, 1):
+            losses[j] += count
+    result = (best, draws, tuple(losses))
+    counters.computed += 1
+    if len(memo) >= memo_limit:
+        memo.clear()
+    memo[key] = result
+    return result
+
+
+def solve_task(size, moves, memo_limit=MEMO_LIMIT):
+    # Wykonywane w procesie puli: pozycja po prefiksie `moves`.
+    global _memo, _memo_size
+    if _memo_size != size:
+        _memo, _memo_size = {}, size
+    board = IndexedBoard(size)
+    for turn, m in enumerate(moves):
+        board.make(m, turn % 3)
+    counters = Counters()
+    result = explore(board, len(moves), _memo, counters, memo_limit)
+    return board.canonical_key(), result, counters.computed, counters.hits
+
+
+def split_tasks(size, split):
+    # Różne (z dokładnością do odbicia) pozycje po `split` ruchach bezpiecznych, każda z jednym prefiksem.
+    tasks = {}
+
+    def walk(board, turn, moves):
+        if turn == split:
+            tasks.setdefault(board.canonical_key(), list(moves))
+            return
+        for m in board.safe_cells(turn % 3):
+            board.make(m, turn % 3)
+            moves.append(m)
+            walk(board, turn + 1, moves)
+            moves.pop()
+            board.undo(m)
+
+    walk(IndexedBoard(size), 0, [])
+    return tasks
+
+
+class Checkpoint:
+    # Plik JSON-lines: nagłówek {"size", "split", "version"}, potem jeden wiersz na ukończone zadanie.
+    # Wiersz dopisywany i zapisywany od razu — po przerwaniu (także w połowie wiersza) wznowienie
+    # wczytuje pełne wiersze i liczy tylko brakujące zadania.
+
+    def __init__(self, path, size, split):
+        self.results = {}
+        header = {"size": size, "split": split, "version": CHECKPOINT_VERSION}
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path) as f:
+                lines = f.read().split("\n")
+            if json.loads(lines[0]) != header:
+                raise SystemExit(f"{path}: punkt kontrolny innej analizy ({lines[0]})")
+            valid = len(lines[0]) + 1
+            for line in lines[1:]:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.results[entry["key"]] = (entry["value"], entry["draws"], tuple(entry["losses"]))
+                valid += len(line) + 1
+            # urwany ostatni wiersz jest obcinany, żeby nowe wpisy zaczynały się od nowej linii
+            with open(path, "r+") as f:
+                f.truncate(valid)
+        self.file = open(path, "a")
+        if not exists:
+            self.file.write(json.dumps(header) + "\n")
+            self.file.flush()
+
+    def add(self, key, result):
+        value, draws, losses = result
+        self.file.write(json.dumps({"key": key, "value": value, "draws": draws, "losses": list(losses)}) + "\n")
+        self.file.flush()
+        self.results[key] = result
+
+    def close(self):
+        self.file.close()
+
+
+def analyse(size, workers=1, split=2, checkpoint=None, memo_limit=MEMO_LIMIT, progress=None):
+    # Zwraca (wynik pozycji początkowej, wyniki po każdym pierwszym ruchu, liczniki).
+    split = max(0, min(split, size - 1))
+    tasks = split_tasks(size, split)
+    memo = {}
+    store = Checkpoint(checkpoint, size, split) if checkpoint else None
+    if store is not None:
+        memo.update(store.results)
+    todo = [(key, moves) for key, moves in tasks.items() if key not in memo]
+    computed = hits = 0
+    done = len(tasks) - len(todo)
+    try:
+        if todo:
+            with ProcessPoolExecutor(workers) as executor:
+                pending = {executor.submit(solve_task, size, moves, memo_limit) for _, moves in todo}
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        key, result, task_computed, task_hits = future.result()
+                        memo[key] = result
+                        computed += task_computed
+                        hits += task_hits
+                        done += 1
+                        if store is not None:
+                            store.add(key, result)
+                        if progress is not None:
+                            progress(done, len(tasks))
+    finally:
+        if store is not None:
+            store.close()
+
+    # Górne poziomy (do głębokości split) liczone w tym procesie; pozycje z głębokości split są już w memo.
+    counters = Counters()
+    board = IndexedBoard(size)
+    root = explore(board, 0, memo, counters, len(memo) + MEMO_LIMIT)
+    first_moves = {}
+    for m in range(1, size + 1):
+        board.make(m, 0)
+        first_moves[m] = explore(board, 1, memo, counters, len(memo) + MEMO_LIMIT)
+        board.undo(m)
+    return root, first_moves, {"tasks": len(tasks), "resumed": len(tasks) - len(todo), "computed": computed,
+                               "memo_hits": hits}
+
+
+def orders(result):
+    value, draws, losses = result
+    return draws + sum(losses)
+
+
+def print_report(size, root, first_moves):
+    value, draws, losses = root
+    total = orders(root)
+    print(f"Plansza {size} pól: {total} kolejności ruchów, remis w {draws} ({draws / total:.2%}); "
+          f"przy grze doskonałej gracz 1 {VALUE_NAMES[value]}.")
+    print(f"{'długość':>8} {'przegrywa 1':>14} {'przegrywa 2':>14} {'remis':>10} {'udział':>8}")
+    for length, count in enumerate(losses, 1):
+        ended = count + (draws if length == size else 0)
+        if not ended:
+            continue
+        first, second = (count, 0) if length % 2 == 1 else (0, count)
+        print(f"{length:>8} {first:>14} {second:>14} {draws if length == size else 0:>10} {ended / total:>8.2%}")
+    print(f"{'1. ruch':>8} {'kolejności':>14} {'przegrywa 1':>12} {'przegrywa 2':>12} {'remis':>8} {'gra doskonała':>14}")
+    for m, result in first_moves.items():
+        value, child_draws, child_losses = result
+        count = orders(result)
+        # child_losses[j]: ciąg w ruchu j + 2 partii — nieparzyste j to ruchy gracza 1
+        first = sum(child_losses[1::2])
+        second = sum(child_losses[0::2])
+        print(f"{m:>8} {count:>14} {first / count:>12.2%} {second / count:>12.2%} {child_draws / count:>8.2%} "
+              f"{VALUE_NAMES[-value]:>14}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--n", type=int, default=4, help="plansza ma 3n pozycji")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--split", type=int, default=2, help="głębokość podziału na zadania puli")
+    parser.add_argument("--checkpoint", help="plik punktu kontrolnego (JSON-lines); istniejący jest wznawiany")
+    parser.add_argument("--memo-limit", type=int, default=MEMO_LIMIT,
+                        help="maksymalna liczba zapamiętanych pozycji w procesie")
+    parser.add_argument("--out", help="zapisz wyniki jako JSON")
+
+
+def run(args):
+    size = 3 * args.n
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r  zadania: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    root, first_moves, stats = analyse(size, args.workers, args.split, args.checkpoint, args.memo_limit, progress)
+    print(file=sys.stderr)
+    print_report(size, root, first_moves)
+    print(f"{stats['tasks']} zadań ({stats['resumed']} z punktu kontrolnego), {stats['computed']} pozycji policzonych, "
+          f"{stats['memo_hits']} trafień w pamięć, {time.perf_counter() - start:.1f} s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"size": size, "value": root[0], "draws": root[1], "losses": list(root[2]),
+                       "first_moves": {m: {"value": -r[0], "draws": r[1], "losses": list(r[2])}
+                                       for m, r in first_moves.items()},
+                       "stats": stats}, f)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pełne wyliczenie partii: remisy, długości partii i pierwsze ruchy.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from .bitboard import Board
+from .mcts import MCTS
+
+_partners = {}
+
+
+def partner_table(size):
+    # partners[x] to pary (y, z) takie, że {x, y, z} jest ciągiem arytmetycznym; dopełnione parą (0, 0),
+    # bo pole 0 na planszy wsadowej jest zawsze puste.
+    table = _partners.get(size)
+    if table is not None:
+        return table
+    rows = []
+    for x in range(size + 1):
+        if x == 0:
+            rows.append(np.zeros((0, 2), dtype=np.int64))
+            continue
+        d = np.arange(1, size + 1)
+        first = d[x + 2 * d <= size]
+        middle = d[(x - d >= 1) & (x + d <= size)]
+        last = d[x - 2 * d >= 1]
+        rows.append(np.concatenate([
+            np.stack([x + first, x + 2 * first], axis=1),
+            np.stack([x - middle, x + middle], axis=1),
+            np.stack([x - 2 * last, x - last], axis=1),
+        ]))
+    width = max(1, max(len(r) for r in rows))
+    dtype = np.int16 if size < np.iinfo(np.int16).max else np.int32
+    table = np.zeros((size + 1, width, 2), dtype=dtype)
+    for x, r in enumerate(rows):
+        table[x, :len(r)] = r
+    _partners[size] = table
+    return table
+
+
+def to_array(board):
+    cells = np.full(board.size + 1, -1, dtype=np.int8)
+    for color in range(3):
+        mask = board.masks[color]
+        while mask:
+            low = mask & -mask
+            cells[low.bit_length() - 1] = color
+            mask ^= low
+    return cells
+
+
+def batch_rollouts(board, turn, batch, rng=None):
+    # `batch` losowych rozgrywek od tej samej pozycji naraz, na tablicy (batch, size + 1) typu int8.
+    # Zwraca liczby (wygrane, przegrane, remisy) z perspektywy gracza, który wykonał poprzedni ruch.
+    rng = rng if rng is not None else np.random.default_rng()
+    empties = np.array(board.empty_cells(), dtype=np.int64)
+    if not len(empties):
+        return 0, 0, batch
+    partners = partner_table(board.size)
+    boards = np.tile(to_array(board), (batch, 1))
+    perms = empties[np.argsort(rng.random((batch, len(empties))), axis=1)]
+    result = np.full(batch, -1, dtype=np.int8)  # -1 remis, 1 wygrana, 0 przegrana
+    active = np.arange(batch)
+    for step in range(len(empties)):
+        color = (turn + step) % 3
+        moves = perms[active, step]
+        boards[active, moves] = color
+        pairs = partners[moves]
+        colors = boards[active[:, None, None], pairs]
+        a, b = colors[..., 0], colors[..., 1]
+        hit = ((a >= 0) & (b >= 0) & (a != b) & (a != color) & (b != color)).any(axis=1)
+        if hit.any():
+            result[active[hit]] = 1 if step % 2 == 0 else 0
+            active = active[~hit]
+            if not len(active):
+                break
+    wins = int((result == 1).sum())
+    losses = int((result == 0).sum())
+    return wins, losses, batch - wins - losses
+
+
+class BatchMCTS(MCTS):
+    # MCTS, który w każdym liściu rozgrywa `batch` symulacji wektorowo i propaguje je jednym wywołaniem.
+    def __init__(self, c=1.41, table=None, batch=256, seed=None):
+        super().__init__(c, table)
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+
+    def evaluate(self, board, turn):
+        wins, losses, draws = batch_rollouts(board, turn, self.batch, self.rng)
+        return wins + 0.5 * draws, self.batch
+
+
+def measure_throughput(size, batch=4096, seconds=1.0, seed=0):
+    # Symulacje na sekundę: wektorowo i pojedynczo (MCTS.simulate) z pustej planszy.
+    board = Board(size)
+    rng = np.random.default_rng(seed)
+    partner_table(size)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        batch_rollouts(board, 0, batch, rng)
+        count += batch
+    vector_rate = count / (time.perf_counter() - start)
+
+    random.seed(seed)
+    engine = MCTS()
+    work = board.copy()
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        engine.simulate(work, 0)
+        count += 1
+    scalar_rate = count / (time.perf_counter() - start)
+    return vector_rate, scalar_rate
+
+
+def measure_search(size, batch=256, seconds=1.0, seed=0):
+    # Symulacje na sekundę w przeszukiwaniu z pustej planszy: BatchMCTS (batch w liściu) i zwykły MCTS.
+    rates = []
+    random.seed(seed)
+    for engine, per_leaf in ((BatchMCTS(batch=batch, seed=seed), batch), (MCTS(), 1)):
+        start = time.perf_counter()
+        engine.search(Board(size), 0, time_limit=seconds)
+        rates.append(engine.iterations * per_leaf / (time.perf_counter() - start))
+    return tuple(rates)
+
+
+def add_arguments(parser):
+    parser.add_argument("--n", type=int, nargs="+", default=[10, 30, 100])
+    parser.add_argument("--batch", type=int, default=4096, help="symulacje naraz przy pomiarze przepustowości")
+    parser.add_argument("--tree-batch", type=int, default=256, help="symulacje w liściu BatchMCTS")
+    parser.add_argument("--time", type=float, default=1.0)
+
+
+def run(args):
+    print(f"{'n':>6} {'wsadowo/s':>12} {'pojedynczo/s':>13} {'krotność':>9} {'BatchMCTS/s':>12} {'MCTS/s':>9}")
+    for n in args.n:
+        vector_rate, scalar_rate = measure_throughput(3 * n, args.batch, args.time)
+        tree_rate, plain_rate = measure_search(3 * n, args.tree_batch, args.time)
+        print(f"{n:>6} {vector_rate:>12.0f} {scalar_rate:>13.0f} {vector_rate / scalar_rate:>9.1f} "
+              f"{tree_rate:>12.0f} {plain_rate:>9.0f}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Przepustowość wsadowych symulacji NumPy.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import argparse
+import itertools
+import json
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from .ai import AI_MODES, EVAL_MODE, choose_move
+from .forbidden import IndexedBoard
+from .mcts import MCTS, count_nodes
+
+BENCH_SIZES = (3, 10, 30, 100, 300, 1000)
+# Tryb z siecią wymaga wytrenowanego modelu, więc mierzony jest tylko na żądanie (--modes).
+BENCH_MODES = tuple(mode for mode in AI_MODES if mode != EVAL_MODE)
+# Metryki, w których większa wartość jest lepsza; w pozostałych (czasy, pamięć) lepsza jest mniejsza.
+HIGHER_IS_BETTER = ("triplet_at_per_s", "find_triplet_per_s", "rollouts_per_s")
+PERCENTILES = (50, 95, 99)
+# Percentyl q jest porównywany tylko przy co najmniej TAIL_SAMPLES / (1 - q) próbkach — p99 z kilkunastu ruchów to
+# w praktyce maksimum, czyli szum (p50 wystarcza dowolna liczba próbek).
+TAIL_SAMPLES = 10
+PERCENTILE_METRIC = re.compile(r"_p(\d+)_ms$")
+
+
+def random_position(size, moves, rng):
+    # Legalna pozycja: `moves` losowych ruchów bezpiecznych (mniej, jeśli bezpiecznych zabraknie).
+    board = IndexedBoard(size)
+    turn = 0
+    while turn < moves:
+        safe = board.safe_cells(turn % 3)
+        if not safe:
+            break
+        board.make(rng.choice(safe), turn % 3)
+        turn += 1
+    return board, turn
+
+
+def rate(fn, seconds):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def percentile(values, q):
+    # Interpolacja liniowa między sąsiednimi próbkami posortowanej listy.
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def bench_detectors(size, seconds, rng):
+    board, turn = random_position(size, size // 3, rng)
+    positions = itertools.cycle([x for x in range(1, size + 1) if not board.is_empty(x)])
+    return rate(lambda: board.triplet_at(next(positions)), seconds), rate(board.find_triplet, seconds)
+
+
+def bench_rollouts(size, seconds, seed):
+    random.seed(seed)
+    engine = MCTS()
+    board = IndexedBoard(size)
+    return rate(lambda: engine.simulate(board, 0), seconds)
+
+
+def bench_moves(size, mode, samples, iterations, time_limit, seed):
+    # Czasy ruchów (s) w pozycjach z różnych faz partii (od pustej planszy do ok. 2/3 zapełnienia).
+    rng = random.Random(seed)
+    random.seed(seed)
+    times = []
+    for i in range(samples):
+        board, turn = random_position(size, 2 * size * i // (3 * samples), rng)
+        start = time.perf_counter()
+        choose_move(board, turn, mode, iterations=iterations, time_limit=time_limit)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_tree_memory(size, iterations, seed):
+    random.seed(seed)
+    engine = MCTS(smart_rollouts=True, rave=True, widening=True)
+    tracemalloc.start()
+    try:
+        root = engine.run(IndexedBoard(size), 0, iterations)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"tree_peak_kib": peak / 1024, "tree_nodes": count_nodes(root)}
+
+
+def run_suite(sizes=BENCH_SIZES, modes=BENCH_MODES, seconds=0.5, samples=10, iterations=200, time_limit=0.2,
+              tree_iterations=300, seed=0, repeats=3, log=None):
+    # Każdy pomiar jest powtarzany `repeats` razy: przepustowość to najlepszy z powtórzeń (min-of-k po czasie),
+    # a percentyle czasu ruchu liczone są ze wszystkich próbek razem.
+    results = {}
+    for n in sizes:
+        size = 3 * n
+        row = {}
+        detectors = [bench_detectors(size, seconds, random.Random(seed)) for _ in range(repeats)]
+        row["triplet_at_per_s"] = max(d[0] for d in detectors)
+        row["find_triplet_per_s"] = max(d[1] for d in detectors)
+        row["rollouts_per_s"] = max(bench_rollouts(size, seconds, seed) for _ in range(repeats))
+        for mode in modes:
+            times = [t for _ in range(repeats) for t in bench_moves(size, mode, samples, iterations, time_limit, seed)]
+            for q in PERCENTILES:
+                row[f"{mode}_p{q}_ms"] = percentile(times, q / 100) * 1000
+        memory = [bench_tree_memory(size, tree_iterations, seed) for _ in range(repeats)]
+        row.update(min(memory, key=lambda m: m["tree_peak_kib"]))
+        results[str(n)] = row
+        if log is not None:
+            log(n, row)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "seconds": seconds,
+            "samples": samples,
+            "repeats": repeats,
+            "iterations": iterations,
+            "time_limit": time_limit,
+            "tree_iterations": tree_iterations,
+        },
+        "results": results,
+    }
+
+
+def move_samples(report):
+    meta = report["meta"]
+    return meta["samples"] * meta.get("repeats", 1)
+
+
+def compare(current, baseline, tolerance):
+    # Zwraca listę (n, metryka, baseline, obecnie, zmiana) dla metryk gorszych o więcej niż tolerance.
+    # Percentyle ogona, na które żaden z raportów nie ma dość próbek, są pomijane.
+    regressions = []
+    samples = min(move_samples(current), move_samples(baseline))
+    for n, row in current["results"].items():
+        base_row = baseline["results"].get(n, {})
+        for metric, value in row.items():
+            base = base_row.get(metric)
+            if not base or metric == "tree_nodes":
+                continue
+            tail = PERCENTILE_METRIC.search(metric)
+            q = int(tail.group(1)) if tail else 50
+            if q > 50 and samples < TAIL_SAMPLES / (1 - q / 100):
+                continue
+            change = value / base - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append((n, metric, base, value, change))
+    return regressions
+
+
+def print_row(n, row):
+    print(f"n={n}")
+    for metric, value in row.items():
+        print(f"  {metric:<28} {value:>14.2f}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--n", type=int, nargs="+", default=list(BENCH_SIZES))
+    parser.add_argument("--modes", nargs="+", choices=AI_MODES, default=list(BENCH_MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time", type=float, default=0.5, help="czas pomiaru przepustowości (s)")
+    parser.add_argument("--samples", type=int, default=10, help="liczba ruchów mierzonych na tryb")
+    parser.add_argument("--repeats", type=int, default=3, help="liczba powtórzeń każdego pomiaru")
+    parser.add_argument("--iterations", type=int, default=200, help="iteracje MCTS na ruch")
+    parser.add_argument("--move-time", type=float, default=0.2, help="limit czasu ruchu (s)")
+    parser.add_argument("--tree-iterations", type=int, default=300, help="iteracje przy pomiarze pamięci drzewa")
+    parser.add_argument("--out", help="zapisz wyniki do pliku JSON")
+    parser.add_argument("--baseline", help="porównaj z wcześniej zapisanym plikiem JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="dopuszczalne pogorszenie (ułamek)")
+
+
+def run(args):
+    report = run_suite(args.n, args.modes, args.time, args.samples, args.iterations, args.move_time,
+                       args.tree_iterations, args.seed, args.repeats, log=print_row)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for n, metric, base, value, change in regressions:
+            print(f"REGRESJA n={n} {metric}: {base:.2f} -> {value:.2f} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"Brak regresji powyżej {args.tolerance:.0%}.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Powtarzalny benchmark detektorów, symulacji i czasu ruchu AI.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+from .zobrist import zobrist_table
+
+
+class Board:
+    # Plansza jako maski bitowe: bit i odpowiada pozycji i (1..size), bit 0 nieużywany.
+    # key i mirror_key to skróty Zobrista planszy i jej odbicia (i <-> size + 1 - i), aktualizowane przy make/undo.
+    __slots__ = ('size', 'masks', 'occupied', 'full', 'keys', 'key', 'mirror_key')
+
+    def __init__(self, size):
+        self.size = size
+        self.masks = [0, 0, 0]
+        self.occupied = 0
+        self.full = ((1 << (size + 1)) - 1) ^ 1
+        self.keys = zobrist_table(size)
+        self.key = 0
+        self.mirror_key = 0
+
+    def copy(self):
+        board = Board.__new__(type(self))
+        board.size = self.size
+        board.masks = self.masks[:]
+        board.occupied = self.occupied
+        board.full = self.full
+        board.keys = self.keys
+        board.key = self.key
+        board.mirror_key = self.mirror_key
+        return board
+
+    def make(self, pos, color):
+        bit = 1 << pos
+        self.masks[color] |= bit
+        self.occupied |= bit
+        self.key ^= self.keys[3 * pos + color]
+        self.mirror_key ^= self.keys[3 * (self.size + 1 - pos) + color]
+
+    def undo(self, pos):
+        color = self[pos]
+        if color is None:
+            return
+        self.masks[color] &= ~(1 << pos)
+        self.occupied &= ~(1 << pos)
+        self.key ^= self.keys[3 * pos + color]
+        self.mirror_key ^= self.keys[3 * (self.size + 1 - pos) + color]
+
+    def canonical_key(self):
+        # Ten sam klucz dla pozycji i jej lustrzanego odbicia.
+        return min(self.key, self.mirror_key)
+
+    def __getitem__(self, pos):
+        bit = 1 << pos
+        for color in range(3):
+            if self.masks[color] & bit:
+                return color
+        return None
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.size == other.size and self.masks == other.masks
+
+    def __hash__(self):
+        return hash((self.size, self.key))
+
+    def __repr__(self):
+        cells = ''.join('.' if c is None else 'RGB'[c] for c in (self[i] for i in range(1, self.size + 1)))
+        return f"Board({cells})"
+
+    def is_empty(self, pos):
+        return 1 <= pos <= self.size and not (self.occupied >> pos) & 1
+
+    def empty_mask(self):
+        return self.full & ~self.occupied
+
+    def empty_cells(self):
+        return bits_to_cells(self.empty_mask())
+
+    def triplet_at(self, pos):
+        color = self[pos]
+        if color is None:
+            return None
+        a, b = (self.masks[c] for c in range(3) if c != color)
+        size = self.size
+        for d in range(1, size):
+            lo, hi = pos - d, pos + d
+            if lo < 1 and hi > size:
+                break
+            # pos pierwszy w ciągu
+            if hi + d <= size and ((a >> hi) & (b >> (hi + d)) | (b >> hi) & (a >> (hi + d))) & 1:
+                return (pos, hi, hi + d)
+            if lo < 1:
+                continue
+            # pos środkowy
+            if hi <= size and ((a >> lo) & (b >> hi) | (b >> lo) & (a >> hi)) & 1:
+                return (lo, pos, hi)
+            # pos ostatni
+            if lo - d >= 1 and ((a >> (lo - d)) & (b >> lo) | (b >> (lo - d)) & (a >> lo)) & 1:
+                return (lo - d, lo, pos)
+        return None
+
+    def find_triplet(self):
+        m = self.masks
+        for d in range(1, (self.size - 1) // 2 + 1):
+            for x, y, z in ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)):
+                hits = m[x] & (m[y] >> d) & (m[z] >> (2 * d))
+                if hits:
+                    start = (hits & -hits).bit_length() - 1
+                    return (start, start + d, start + 2 * d)
+        return None
+
+    def forbidden(self, color):
+        # Maska pustych pól, na których dany kolor od razu utworzyłby tęczowy ciąg.
+        a, b = (self.masks[c] for c in range(3) if c != color)
+        empty = self.empty_mask()
+        result = 0
+        for d in range(1, (self.size - 1) // 2 + 1):
+            d2 = 2 * d
+            result |= ((a << d) & (b >> d)) | ((b << d) & (a >> d))
+            result |= ((a >> d) & (b >> d2)) | ((b >> d) & (a >> d2))
+            result |= ((a << d) & (b << d2)) | ((b << d) & (a << d2))
+        return result & empty
+
+    def safe_mask(self, color):
+        return self.empty_mask() & ~self.forbidden(color)
+
+
+def bits_to_cells(mask):
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells
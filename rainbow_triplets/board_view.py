@@ -0,0 +1,200 @@
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+from PyQt5.QtCore import QRect, QSize, Qt, pyqtSignal
+
+EMPTY = 255
+
+
+class BoardView(QAbstractScrollArea):
+    # Cała plansza jako jeden rysowany widżet: pola zawijane w wiersze na szerokość okna, przewijanie w pionie,
+    # Ctrl+kółko (albo +/-) zmienia rozmiar pola. Rysowane są tylko pola z odświeżanego prostokąta,
+    # a ruch odświeża jedno pole — koszt budowy i ruchu nie zależy od liczby pozycji.
+    cell_clicked = pyqtSignal(int)
+
+    MIN_CELL = 6
+    MAX_CELL = 96
+    # Poniżej tej wielkości pola numery nie są rysowane.
+    LABEL_CELL = 22
+    # Od tej wielkości pola nakładka analizy pokazuje też procent wygranych.
+    ANALYSIS_TEXT_CELL = 36
+    PREFERRED_COLUMNS = 20
+    PREFERRED_ROWS = 10
+
+    def __init__(self, size, palette, cell=40, columns=None, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.palette_colors = palette
+        self.cell = cell
+        # stała liczba kolumn zamiast zawijania na szerokość okna
+        self.fixed_columns = columns
+        # kolor pola 1..size albo EMPTY; bytearray wystarcza także dla 10^5 pozycji
+        self.cells = bytearray([EMPTY]) * (size + 1)
+        self.marked = set()
+        # nakładka analizy: pole -> (szansa wygranej gracza na ruchu, udział odwiedzin); losing — ruchy przegrywające
+        self.analysis = {}
+        self.losing = set()
+        self.max_share = 1.0
+        self.locked = False
+        self.empty_color = QColor("#e0e0e0")
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.update_scrollbar()
+
+    def columns(self):
+        if self.fixed_columns:
+            return self.fixed_columns
+        return max(1, self.viewport().width() // self.cell)
+
+    def rows(self):
+        return -(-self.size // self.columns())
+
+    def cell_rect(self, pos):
+        row, col = divmod(pos - 1, self.columns())
+        return QRect(col * self.cell, row * self.cell - self.verticalScrollBar().value(), self.cell, self.cell)
+
+    def cell_at(self, point):
+        columns = self.columns()
+        col = point.x() // self.cell
+        if col >= columns or point.x() < 0:
+            return None
+        row = (point.y() + self.verticalScrollBar().value()) // self.cell
+        pos = row * columns + col + 1
+        return pos if 1 <= pos <= self.size else None
+
+    def sizeHint(self):
+        columns = min(self.size, self.fixed_columns or self.PREFERRED_COLUMNS)
+        rows = min(-(-self.size // columns), self.PREFERRED_ROWS)
+        frame = 2 * self.frameWidth()
+        scrollbar = self.verticalScrollBar().sizeHint().width()
+        return QSize(columns * self.cell + frame + scrollbar, rows * self.cell + frame)
+
+    def update_scrollbar(self):
+        bar = self.verticalScrollBar()
+        height = self.viewport().height()
+        bar.setRange(0, max(0, self.rows() * self.cell - height))
+        bar.setPageStep(height)
+        bar.setSingleStep(self.cell)
+
+    def set_cell(self, pos, code):
+        self.cells[pos] = code
+        self.viewport().update(self.cell_rect(pos))
+
+    def mark(self, positions):
+        self.marked.update(positions)
+        for pos in positions:
+            self.viewport().update(self.cell_rect(pos))
+
+    def set_analysis(self, cells, losing=()):
+        # Jedno odświeżenie widocznego obszaru na migawkę — koszt zależy od wielkości okna, nie od tempa analizy.
+        self.analysis = cells
+        self.losing = set(losing)
+        self.max_share = max((share for _, share in cells.values()), default=0.0) or 1.0
+        self.viewport().update()
+
+    def clear_analysis(self):
+        if self.analysis or self.losing:
+            self.set_analysis({})
+
+    def set_locked(self, locked):
+        self.locked = locked
+
+    def set_cell_size(self, cell, anchor=None):
+        # Zmiana skali z zachowaniem pola pod kursorem (anchor) na tej samej wysokości ekranu.
+        cell = max(self.MIN_CELL, min(self.MAX_CELL, cell))
+        if cell == self.cell:
+            return
+        pos = self.cell_at(anchor) if anchor is not None else None
+        offset = anchor.y() if anchor is not None else 0
+        self.cell = cell
+        self.update_scrollbar()
+        if pos is not None:
+            row = (pos - 1) // self.columns()
+            self.verticalScrollBar().setValue(row * cell + cell // 2 - offset)
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        area = event.rect()
+        painter.fillRect(area, self.palette().window())
+        cell = self.cell
+        columns = self.columns()
+        top = self.verticalScrollBar().value()
+        first_row = max(0, (area.top() + top) // cell)
+        last_row = min(self.rows() - 1, (area.bottom() + top) // cell)
+        first_col = max(0, area.left() // cell)
+        last_col = min(columns - 1, area.right() // cell)
+        gap = 1 if cell < 12 else 2
+        labels = cell >= self.LABEL_CELL
+        if labels:
+            font = QFont(painter.font())
+            font.setPixelSize(max(8, cell // 3))
+            painter.setFont(font)
+        marked_pen = QPen(Qt.black, 3)
+        losing_pen = QPen(QColor("#b00020"), max(1, cell // 16))
+        analysis_text = labels and cell >= self.ANALYSIS_TEXT_CELL and bool(self.analysis)
+        for row in range(first_row, last_row + 1):
+            y = row * cell - top
+            base = row * columns
+            for col in range(first_col, last_col + 1):
+                pos = base + col + 1
+                if pos > self.size:
+                    break
+                rect = QRect(col * cell + gap, y + gap, cell - 2 * gap, cell - 2 * gap)
+                code = self.cells[pos]
+                painter.fillRect(rect, self.empty_color if code == EMPTY else self.palette_colors[code])
+                if pos in self.marked:
+                    painter.setPen(marked_pen)
+                    painter.drawRect(rect.adjusted(1, 1, -2, -2))
+                hint = self.analysis.get(pos) if code == EMPTY else None
+                if code == EMPTY and pos in self.losing:
+                    painter.setPen(losing_pen)
+                    inner = rect.adjusted(cell // 6, cell // 6, -cell // 6, -cell // 6)
+                    painter.drawLine(inner.topLeft(), inner.bottomRight())
+                    painter.drawLine(inner.topRight(), inner.bottomLeft())
+                elif hint is not None:
+                    self.paint_hint(painter, rect, hint, analysis_text)
+                if labels:
+                    painter.setPen(Qt.black if code == EMPTY else Qt.white)
+                    painter.drawText(rect, Qt.AlignTop | Qt.AlignHCenter if analysis_text else Qt.AlignCenter, str(pos))
+
+    def paint_hint(self, painter, rect, hint, text):
+        # Pasek u dołu pola: długość — udział odwiedzin względem najczęściej badanego ruchu,
+        # kolor — od czerwonego (przegrana) do zielonego (wygrana).
+        win, share = hint
+        color = QColor.fromHsvF(win / 3, 0.8, 0.8)
+        height = max(2, rect.height() // 8)
+        width = max(1, int(rect.width() * share / self.max_share))
+        painter.fillRect(QRect(rect.left(), rect.bottom() - height + 1, width, height), color)
+        if text:
+            painter.setPen(color.darker(150))
+            painter.drawText(rect.adjusted(0, 0, 0, -height), Qt.AlignBottom | Qt.AlignHCenter, f"{win:.0%}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbar()
+
+    def scrollContentsBy(self, dx, dy):
+        # Przesuwa już narysowaną treść; paintEvent dostaje tylko odsłonięty pasek.
+        self.viewport().scroll(dx, dy)
+
+    def mousePressEvent(self, event):
+        if self.locked or event.button() != Qt.LeftButton:
+            return
+        pos = self.cell_at(event.pos())
+        if pos is not None:
+            self.cell_clicked.emit(pos)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            step = 1 if event.angleDelta().y() > 0 else -1
+            self.set_cell_size(self.cell + step * max(1, self.cell // 8), event.pos())
+        else:
+            super().wheelEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.set_cell_size(self.cell + max(1, self.cell // 8))
+        elif event.key() == Qt.Key_Minus:
+            self.set_cell_size(self.cell - max(1, self.cell // 8))
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,172 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from .bitboard import Board
+from .solver import Solver
+from .zobrist import splitmix64
+
+# Plik: nagłówek, posortowane klucze (uint64) i spakowane wartości (int8 wynik, uint8 flagi, uint16 ruch).
+# Ruch zapisany w orientacji kanonicznej (0 = brak), wynik z perspektywy gracza na ruchu.
+MAGIC = b"RTBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+KEY = struct.Struct("<Q")
+VALUE = struct.Struct("<bBH")
+FLAG_EXACT = 1
+
+SIZE_SALT = 0x5A17
+
+
+def book_key(board):
+    # Klucze Zobrista nie zależą od rozmiaru planszy, więc go domieszujemy.
+    return board.canonical_key() ^ splitmix64(SIZE_SALT + board.size)
+
+
+def to_canonical(board, move):
+    if move is None:
+        return 0
+    return board.size + 1 - move if board.key != board.canonical_key() else move
+
+
+def from_canonical(board, move):
+    if move == 0:
+        return None
+    return board.size + 1 - move if board.key != board.canonical_key() else move
+
+
+class OpeningBook:
+    # Odczyt przez mmap i wyszukiwanie binarne: plik nie jest wczytywany do pamięci przy starcie.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: to nie jest plik księgi otwarć w wersji {VERSION}")
+        self.keys_offset = HEADER.size
+        self.values_offset = self.keys_offset + self.count * KEY.size
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def key_at(self, index):
+        return KEY.unpack_from(self.data, self.keys_offset + index * KEY.size)[0]
+
+    def find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.key_at(lo) == key:
+            return lo
+        return None
+
+    def lookup(self, board):
+        # Zwraca (wynik, ruch, czy wynik dokładny) albo None, gdy pozycji nie ma w księdze.
+        index = self.find(book_key(board))
+        if index is None:
+            return None
+        value, flags, move = VALUE.unpack_from(self.data, self.values_offset + index * VALUE.size)
+        return value, from_canonical(board, move), bool(flags & FLAG_EXACT)
+
+
+def write_book(path, entries):
+    # entries: dict klucz -> (wynik, flagi, ruch kanoniczny)
+    keys = sorted(entries)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys)))
+        for key in keys:
+            f.write(KEY.pack(key))
+        for key in keys:
+            f.write(VALUE.pack(*entries[key]))
+
+
+def opening_positions(size, plies):
+    # Wszystkie nieskończone pozycje po co najwyżej `plies` ruchach, bez powtórzeń i odbić.
+    seen = set()
+    layer = [(Board(size), 0)]
+    positions = []
+    for ply in range(plies + 1):
+        next_layer = []
+        for board, turn in layer:
+            key = board.canonical_key()
+            if key in seen:
+                continue
+            seen.add(key)
+            positions.append((board, turn))
+            if ply == plies:
+                continue
+            for m in board.empty_cells():
+                child = board.copy()
+                child.make(m, turn % 3)
+                if not child.triplet_at(m) and child.empty_mask():
+                    next_layer.append((child, turn + 1))
+        layer = next_layer
+    return positions
+
+
+def build_entries(size, plies, max_empty, max_nodes=None, time_limit=None, entries=None):
+    entries = {} if entries is None else entries
+
+    def record(board, turn, value, move):
+        if board.empty_mask().bit_count() <= max_empty:
+            entries[book_key(board)] = (value, FLAG_EXACT, to_canonical(board, move))
+
+    solver = Solver(max_nodes=max_nodes, time_limit=time_limit)
+    solver.on_solved = record
+    for board, turn in opening_positions(size, plies):
+        value, move, exact = solver.solve(board, turn)
+        key = book_key(board)
+        if move is not None and (exact or key not in entries):
+            entries[key] = (value, FLAG_EXACT if exact else 0, to_canonical(board, move))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Księga otwarć i baza końcówek dla Tęczowych Trójek.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="policz i zapisz księgę")
+    build.add_argument("--n", type=int, nargs="+", required=True, help="wartości n (plansza 3n)")
+    build.add_argument("--plies", type=int, default=2, help="liczba ruchów otwarcia")
+    build.add_argument("--empty", type=int, default=10, help="maksymalna liczba pustych pól w końcówkach")
+    build.add_argument("--max-nodes", type=int, default=None, help="limit węzłów solvera na pozycję")
+    build.add_argument("--time", type=float, default=None, help="limit czasu solvera na pozycję (s)")
+    build.add_argument("--out", default="book.bin")
+
+    probe = sub.add_parser("probe", help="sprawdź pozycję w księdze")
+    probe.add_argument("book")
+    probe.add_argument("n", type=int, help="wartość n (plansza 3n)")
+    probe.add_argument("moves", type=int, nargs="*", help="ruchy od początku partii")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        entries = {}
+        for n in args.n:
+            start = time.perf_counter()
+            before = len(entries)
+            build_entries(3 * n, args.plies, args.empty, args.max_nodes, args.time, entries)
+            print(f"n={n}: {len(entries) - before} pozycji, {time.perf_counter() - start:.1f} s")
+        write_book(args.out, entries)
+        print(f"zapisano {len(entries)} pozycji do {args.out} ({os.path.getsize(args.out)} B)")
+    else:
+        board = Board(3 * args.n)
+        for turn, m in enumerate(args.moves):
+            board.make(m, turn % 3)
+        book = OpeningBook(args.book)
+        print(book.lookup(board))
+        book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import importlib
+import random
+import sys
+import time
+
+from .ai import AI_MODES, EVAL_MODE, choose_move, new_eval_engine, new_mcts_engine
+from .forbidden import IndexedBoard
+from .heuristic import HeuristicEngine
+from .instrument import PHASES, Instrumentation
+from .solver import Solver
+
+COLOR_NAMES = "RGB"
+# Podkomendy z osobnych modułów (asyncio, pule procesów): moduł i jego argumenty ładowane są tylko dla wybranej
+# podkomendy, żeby start CLI nie płacił za ich importy.
+MODULE_COMMANDS = (
+    ("bench", "benchmark", "benchmark detektorów, symulacji i czasu ruchu (JSON, porównanie z bazą)"),
+    ("tournament", "tournament", "turniej AI kontra AI na puli procesów (Elo, SPRT)"),
+    ("serve", "server", "serwer wielu partii naraz (JSON-lines po TCP)"),
+    ("loadtest", "loadtest", "test obciążenia serwera gry"),
+    ("analytics", "analytics", "pełne wyliczenie partii: remisy, długości, pierwsze ruchy"),
+    ("distributed", "distributed", "rozproszona analiza pozycji: koordynator i pracownicy po TCP"),
+    ("speedup", "parallel_mcts", "przyspieszenie równoległego MCTS (korzeń/liście) względem jednego procesu"),
+    ("batch", "batch_rollout", "wsadowe symulacje NumPy i BatchMCTS kontra zwykłe symulacje"),
+    ("rave", "rave_benchmark", "siła MCTS z RAVE i poszerzaniem kontra UCB1"),
+)
+
+
+def render(board):
+    # Plansza w wierszach po 10 pól: "numer:kolor", kropka dla pustego pola.
+    cells = []
+    for i in range(1, board.size + 1):
+        color = board[i]
+        cells.append(f"{i:>4}:{'.' if color is None else COLOR_NAMES[color]}")
+    return "\n".join("".join(cells[i:i + 10]) for i in range(0, len(cells), 10))
+
+
+def replay(n, moves):
+    board = IndexedBoard(3 * n)
+    for turn, m in enumerate(moves):
+        if not board.is_empty(m):
+            raise SystemExit(f"ruch {m} (nr {turn + 1}) jest niedozwolony")
+        board.make(m, turn % 3)
+        if board.triplet_at(m):
+            raise SystemExit(f"ruch {m} (nr {turn + 1}) kończy partię tęczowym ciągiem")
+    return board, len(moves)
+
+
+def cmd_play(args):
+    if args.seed is not None:
+        random.seed(args.seed)
+    instrumentation = open_instrumentation(args)
+    try:
+        return play(args, instrumentation)
+    finally:
+        if instrumentation is not None:
+            instrumentation.close()
+
+
+def play(args, instrumentation=None):
+    board = IndexedBoard(3 * args.n)
+    turn = 0
+    players = [args.ai2 or "człowiek", args.ai] if args.first == "human" else [args.ai, args.ai2 or "człowiek"]
+    # heurystyka pamięta oceny pól między turami, więc każdy gracz-komputer ma własny silnik na całą partię;
+    # MCTS przesuwa drzewo i tablicę transpozycji między ruchami (z --max-nodes także pulę węzłów)
+    engines = [new_engine(player, args) for player in players]
+    while board.empty_mask():
+        player = players[turn % 2]
+        print(render(board))
+        if player == "człowiek":
+            move = ask_move(board)
+            if move is None:
+                return 0
+        else:
+            start = time.perf_counter()
+            move = choose_move(board, turn, player, args.iterations, args.time, engine=engines[turn % 2],
+                               instrumentation=instrumentation)
+            print(f"{player} (gracz {turn % 2 + 1}): {move} w {time.perf_counter() - start:.2f} s")
+        board.make(move, turn % 3)
+        for engine in engines:
+            if engine is not None:
+                engine.advance(move)
+        triplet = board.triplet_at(move)
+        if triplet:
+            print(render(board))
+            print(f"Tęczowy ciąg {triplet} — przegrywa gracz {turn % 2 + 1} ({player}).")
+            return 0
+        turn += 1
+    print(render(board))
+    print("Remis: brak dostępnych ruchów.")
+    return 0
+
+
+def new_engine(player, args):
+    if player == "heurystyczny":
+        return HeuristicEngine(args.lookahead)
+    if player == "mcts":
+        return new_mcts_engine(args.max_nodes)
+    if player == EVAL_MODE:
+        return new_eval_engine(args.weights, args.max_nodes)
+    return None
+
+
+def open_instrumentation(args):
+    if not args.log and not args.stats:
+        return None
+    instrumentation = Instrumentation(args.log)
+    if args.stats:
+        instrumentation.subscribe(print_stats)
+    return instrumentation
+
+
+def print_stats(stats):
+    parts = [f"{stats.engine}", f"{stats.wall_time * 1000:.1f} ms"]
+    if stats.iterations is not None:
+        parts.append(f"{stats.iterations} iteracji, {stats.nodes} nowych węzłów, głębokość {stats.depth}")
+        parts.append(" / ".join(f"{getattr(stats, phase) * 1000:.1f}" for phase in PHASES) + " ms (fazy)")
+        if stats.rollouts_per_s is not None:
+            parts.append(f"{stats.rollouts_per_s:.0f} symulacji/s")
+    elif stats.nodes is not None:
+        parts.append(f"{stats.nodes} węzłów solvera, głębokość {stats.depth}")
+    if stats.detector_calls is not None:
+        parts.append(f"{stats.detector_calls} wywołań detektora")
+    if stats.cache_hits is not None:
+        parts.append(f"cache: {stats.cache_hits} trafień, {stats.cache_misses} chybień, "
+                     f"{stats.invalidations} unieważnień")
+    if stats.tt_hits is not None:
+        parts.append(f"TT: {stats.tt_hits} trafień, {stats.tt_misses} chybień ({stats.tt_hit_rate:.1%})")
+    if stats.tree_nodes is not None:
+        parts.append(f"drzewo: {stats.tree_nodes} węzłów, {stats.recycled} odzyskanych")
+    print("  [" + ", ".join(parts) + "]")
+
+
+def ask_move(board):
+    while True:
+        try:
+            text = input("Twój ruch (q = koniec): ").strip()
+        except EOFError:
+            return None
+        if text == "q":
+            return None
+        if text.isdigit() and board.is_empty(int(text)):
+            return int(text)
+        print("Niepoprawne pole.")
+
+
+def cmd_analyze(args):
+    board, turn = replay(args.n, args.moves)
+    code = turn % 3
+    print(render(board))
+    print(f"Na ruchu: gracz {turn % 2 + 1}, kolor {COLOR_NAMES[code]}")
+    safe = board.safe_cells(code)
+    print(f"Bezpieczne pola ({len(safe)}): {safe}")
+    if not board.empty_mask():
+        print("Plansza pełna — remis.")
+        return 0
+
+    solver = Solver(time_limit=args.time)
+    value, move, exact = solver.solve(board, turn)
+    label = {1: "wygrana", 0: "remis", -1: "przegrana"}[value]
+    print(f"Solver: {label if exact else 'nierozstrzygnięte'}, ruch {move}, {solver.nodes} węzłów, głębokość {solver.depth}")
+
+    # z --weights drzewo ocenia liście siecią (EVAL_MODE) zamiast symulacji
+    engine = new_eval_engine(args.weights, args.max_nodes) if args.weights else new_mcts_engine(args.max_nodes)
+    root = engine.run(board, turn, time_limit=args.time)
+    tree = engine.tree_report()
+    print(f"{'MCTS z siecią' if args.weights else 'MCTS'}: {engine.iterations} iteracji, drzewo {tree['nodes']} węzłów, "
+          f"TT {engine.table.hit_rate():.1%} trafień"
+          + (f" (limit {tree['capacity']}, {tree['recycled']} odzyskanych, {tree['pruned']} zwiniętych poddrzew)"
+             if engine.pool is not None else ""))
+    for child in sorted(root.children, key=lambda c: -c.visits)[:args.top]:
+        print(f"  {child.move:>5}  odwiedziny {child.visits / root.visits:6.1%}  wygrane {child.wins / child.visits:6.1%}")
+    return 0
+
+
+def cmd_records(args):
+    from . import records
+    return records.main(args.args)
+
+
+def cmd_gui(args):
+    # Jedyne miejsce CLI, które ładuje Qt.
+    from .gui import run
+    instrumentation = Instrumentation(args.log) if args.log else None
+    try:
+        return run(sys.argv[:1], instrumentation=instrumentation, analysis=args.analysis)
+    finally:
+        if instrumentation is not None:
+            instrumentation.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rainbow_triplets", description="Tęczowe Trójki bez interfejsu graficznego.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    play = sub.add_parser("play", help="zagraj w terminalu z komputerem albo puść partię komputer–komputer")
+    play.add_argument("--n", type=int, default=3, help="plansza ma 3n pozycji")
+    play.add_argument("--ai", choices=AI_MODES, default="mcts")
+    play.add_argument("--ai2", choices=AI_MODES, help="drugi komputer zamiast człowieka")
+    play.add_argument("--first", choices=["human", "ai"], default="human", help="kto zaczyna")
+    play.add_argument("--time", type=float, default=1.0, help="czas na ruch komputera (s)")
+    play.add_argument("--lookahead", type=int, choices=[1, 2], default=1,
+                      help="heurystyka: 2 = ocena także najlepszej odpowiedzi rywala")
+    play.add_argument("--iterations", type=int, help="stała liczba iteracji MCTS zamiast czasu")
+    play.add_argument("--max-nodes", type=int, help="MCTS: limit węzłów drzewa (pula, przycinanie rzadkich poddrzew)")
+    play.add_argument("--weights", help=f"{EVAL_MODE}: plik modelu sieci (domyślnie evaluator.npz)")
+    play.add_argument("--seed", type=int)
+    play.add_argument("--stats", action="store_true", help="wypisz statystyki każdego ruchu komputera")
+    play.add_argument("--log", help="dopisuj statystyki ruchów komputera do pliku JSON-lines")
+    play.set_defaults(func=cmd_play)
+
+    analyze = sub.add_parser("analyze", help="oceń pozycję po podanych ruchach")
+    analyze.add_argument("--n", type=int, required=True, help="plansza ma 3n pozycji")
+    analyze.add_argument("moves", type=int, nargs="*", help="ruchy od początku partii")
+    analyze.add_argument("--time", type=float, default=1.0, help="czas dla solvera i MCTS (s)")
+    analyze.add_argument("--top", type=int, default=5, help="ile najlepszych ruchów MCTS pokazać")
+    analyze.add_argument("--max-nodes", type=int, help="limit węzłów drzewa MCTS (pula, przycinanie rzadkich poddrzew)")
+    analyze.add_argument("--weights", help=f"plik modelu sieci: MCTS ocenia liście siecią ({EVAL_MODE})")
+    analyze.set_defaults(func=cmd_analyze)
+
+    command = next((arg for arg in (sys.argv[1:] if argv is None else argv) if not arg.startswith("-")), None)
+    for name, module_name, help_text in MODULE_COMMANDS:
+        module_parser = sub.add_parser(name, help=help_text)
+        if name == command:
+            module = importlib.import_module(f"{__package__}.{module_name}")
+            module.add_arguments(module_parser)
+            module_parser.set_defaults(func=module.run)
+
+    record = sub.add_parser("records", help="zapisy partii: info, show, verify", add_help=False)
+    record.add_argument("args", nargs=argparse.REMAINDER)
+    record.set_defaults(func=cmd_records)
+
+    gui = sub.add_parser("gui", help="uruchom interfejs graficzny (PyQt5)")
+    gui.add_argument("--log", help="dopisuj statystyki ruchów komputera do pliku JSON-lines")
+    gui.add_argument("--analysis", action="store_true", help="włącz od początku podpowiedzi (analizę w tle)")
+    gui.set_defaults(func=cmd_gui)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
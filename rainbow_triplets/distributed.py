@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+from .forbidden import IndexedBoard
+from .solver import Solver
+from .zobrist import TranspositionTable
+
+# Protokół (JSON-lines po TCP), pracownik pyta, koordynator odpowiada:
+#   {"op": "ready", "pid": 123} / {"op": "result", "task": 7, "value": -1, "move": 4, "nodes": 1234}
+#   -> {"op": "task", "task": 7, "size": 18, "moves": [...]} | {"op": "wait", "delay": 0.05} | {"op": "done"}
+# Wartości jak w Solver: z perspektywy gracza na ruchu, 1 = wygrana, 0 = remis, -1 = przegrana.
+WAIT_DELAY = 0.05
+CONNECT_RETRIES = 20
+LINE_LIMIT = 1 << 20
+VALUE_NAMES = {1: "wygrywa", 0: "remisuje", -1: "przegrywa"}
+
+
+class TreeNode:
+    # Pozycja drzewa koordynatora (jedna na klucz kanoniczny). Liść jest zadaniem dla pracownika,
+    # węzeł z children rozstrzyga minimaks; moves to ruchy od początku partii prowadzące do tej pozycji.
+    __slots__ = ('id', 'key', 'moves', 'parents', 'children', 'value', 'best', 'state', 'worker', 'started')
+
+    def __init__(self, node_id, key, moves):
+        self.id = node_id
+        self.key = key
+        self.moves = moves
+        self.parents = []
+        self.children = []
+        self.value = None
+        self.best = None
+        self.state = "new"
+        self.worker = None
+        self.started = None
+
+
+class Coordinator:
+    # Drzewo od pozycji startowej jest rozwijane do głębokości split; pozycje na tej głębokości to zadania.
+    # Pracownicy pobierają zadania z kolejki; gdy kolejka jest pusta, wolny pracownik "kradnie" pracę:
+    # najdłużej liczone zadanie dzielone jest o jeden półruch, a jego dzieci trafiają do kolejki (wynik daje to,
+    # co skończy się pierwsze). Zadanie pracownika, który się rozłączył, wraca na początek kolejki.
+
+    def __init__(self, size, moves=(), split=2):
+        self.size = size
+        self.ids = itertools.count(1)
+        self.nodes = {}
+        self.by_id = {}
+        self.queue = deque()
+        self.running = {}
+        self.workers = {}
+        # pid procesu pracownika (z "ready"), żeby tryb local mógł zabić pracownika w trakcie zadania
+        self.pids = {}
+        self.finished = asyncio.Event()
+        self.server = None
+        self.connections = set()
+        self.solver_nodes = 0
+        self.tasks_done = 0
+        self.wasted = 0
+        self.reissued = 0
+        self.steals = 0
+        self.started = time.perf_counter()
+        self.elapsed = None
+        board = IndexedBoard(size)
+        for turn, m in enumerate(moves):
+            if not board.is_empty(m):
+                raise ValueError(f"ruch {turn + 1}: pole {m} zajęte albo poza planszą")
+            board.make(m, turn % 3)
+            if board.triplet_at(m):
+                raise ValueError(f"ruch {m} (nr {turn + 1}) kończy partię tęczowym ciągiem")
+        self.turn = len(moves)
+        self.root = self.node_for(board, self.turn, list(moves), split)
+
+    def node_for(self, board, turn, moves, depth):
+        key = board.canonical_key()
+        node = self.nodes.get(key)
+        if node is not None:
+            return node
+        node = TreeNode(next(self.ids), key, moves)
+        self.nodes[key] = node
+        self.by_id[node.id] = node
+        empty = board.empty_cells()
+        if not empty:
+            self.resolve(node, 0, None)
+        elif not board.safe[turn % 3]:
+            self.resolve(node, -1, empty[0])
+        elif depth == 0:
+            node.state = "queued"
+            self.queue.append(node)
+        else:
+            self.expand(node, board, turn, depth)
+        return node
+
+    def expand(self, node, board, turn, depth):
+        # Tylko ruchy bezpieczne: pole zakazane przegrywa od razu, więc nie jest lepsze od żadnego z nich.
+        node.state = "split"
+        code = turn % 3
+        for m in board.safe_cells(code):
+            board.make(m, code)
+            child = self.node_for(board, turn + 1, node.moves + [m], depth - 1)
+            board.undo(m)
+            child.parents.append(node)
+            node.children.append((m, child))
+        self.check(node)
+
+    def resolve(self, node, value, best):
+        if node.value is not None:
+            return
+        node.value = value
+        node.best = best
+        node.state = "done"
+        for parent in node.parents:
+            self.check(parent)
+        if node is self.root:
+            self.elapsed = time.perf_counter() - self.started
+            self.finished.set()
+
+    def check(self, node):
+        # Węzeł rozstrzygnięty, gdy znany jest ruch wygrywający albo wartości wszystkich dzieci.
+        if node.value is not None or not node.children:
+            return
+        best_value, best_move, pending = -2, None, False
+        for m, child in node.children:
+            if child.value is None:
+                pending = True
+            elif -child.value > best_value:
+                best_value, best_move = -child.value, m
+        if best_value == 1 or not pending:
+            self.resolve(node, best_value, best_move)
+
+    def needed(self, node):
+        return node.value is None and (node is self.root or any(self.needed(p) for p in node.parents))
+
+    def next_task(self, worker):
+        while self.queue:
+            node = self.queue.popleft()
+            if node.state == "queued" and self.needed(node):
+                return self.assign(node, worker)
+        victims = [n for n in self.running.values() if not n.children and self.needed(n)]
+        if not victims:
+            return None
+        victim = min(victims, key=lambda n: n.started)
+        board = IndexedBoard(self.size)
+        for turn, m in enumerate(victim.moves):
+            board.make(m, turn % 3)
+        self.steals += 1
+        self.expand(victim, board, len(victim.moves), 1)
+        return self.next_task(worker) if self.queue else None
+
+    def assign(self, node, worker):
+        node.state = "running"
+        node.worker = worker
+        node.started = time.perf_counter()
+        self.running[worker] = node
+        return {"op": "task", "task": node.id, "size": self.size, "moves": node.moves}
+
+    def record(self, worker, message):
+        node = self.running.pop(worker, None)
+        if node is None or node.id != message["task"]:
+            raise ValueError("wynik zadania, które nie było przydzielone")
+        self.solver_nodes += message["nodes"]
+        self.tasks_done += 1
+        self.workers[worker] += 1
+        if node.value is None:
+            self.resolve(node, message["value"], message["move"])
+        else:
+            self.wasted += 1
+
+    def lost(self, worker):
+        # Pracownik zniknął w trakcie zadania; podzielone zadanie rozstrzygną jego dzieci.
+        node = self.running.pop(worker, None)
+        if node is not None and node.value is None and not node.children:
+            node.state = "queued"
+            self.queue.appendleft(node)
+            self.reissued += 1
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for task in self.connections:
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle(self, reader, writer):
+        host, port = writer.get_extra_info("peername")[:2]
+        worker = f"{host}:{port}"
+        self.workers[worker] = 0
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("op") == "result":
+                    self.record(worker, message)
+                elif message.get("op") == "ready":
+                    if "pid" in message:
+                        self.pids[worker] = message["pid"]
+                else:
+                    raise ValueError(f"nieznana operacja: {message.get('op')!r}")
+                if self.finished.is_set():
+                    reply = {"op": "done"}
+                else:
+                    reply = self.next_task(worker) or {"op": "wait", "delay": WAIT_DELAY}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+                if reply["op"] == "done":
+                    break
+        except (ConnectionError, ValueError, KeyError, asyncio.CancelledError):
+            pass
+        finally:
+            self.lost(worker)
+            self.connections.discard(task)
+            writer.close()
+
+    def busy_pids(self):
+        return [self.pids[worker] for worker, node in self.running.items() if worker in self.pids and node.value is None]
+
+    def report(self):
+        return {
+            "value": self.root.value,
+            "best": self.root.best,
+            "solver_nodes": self.solver_nodes,
+            "positions": len(self.nodes),
+            "tasks_done": self.tasks_done,
+            "wasted": self.wasted,
+            "reissued": self.reissued,
+            "steals": self.steals,
+            "workers": dict(self.workers),
+            "time": self.elapsed,
+        }
+
+
+def work(host, port, table_size=1 << 20):
+    # Pracownik: pobiera zadania do chwili "done"; tablica transpozycji solvera jest wspólna dla jego zadań.
+    table = TranspositionTable(table_size)
+    for attempt in range(CONNECT_RETRIES):
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except ConnectionRefusedError:
+            if attempt == CONNECT_RETRIES - 1:
+                raise
+            time.sleep(0.5)
+    tasks = 0
+    with sock, sock.makefile("rwb") as f:
+        message = {"op": "ready", "pid": os.getpid()}
+        while True:
+            f.write(json.dumps(message).encode() + b"\n")
+            f.flush()
+            line = f.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            if reply["op"] == "done":
+                break
+            if reply["op"] == "wait":
+                time.sleep(reply["delay"])
+                message = {"op": "ready"}
+                continue
+            board = IndexedBoard(reply["size"])
+            for turn, m in enumerate(reply["moves"]):
+                board.make(m, turn % 3)
+            solver = Solver(table)
+            value, move, exact = solver.solve(board, len(reply["moves"]))
+            message = {"op": "result", "task": reply["task"], "value": value, "move": move, "nodes": solver.nodes}
+            tasks += 1
+    return tasks
+
+
+def print_report(report, turn):
+    print(f"Gracz {turn % 2 + 1} (na ruchu) {VALUE_NAMES[report['value']]}"
+          + (f", najlepszy ruch {report['best']}" if report["best"] is not None else "") + ".")
+    print(f"{report['positions']} pozycji w drzewie koordynatora, {report['tasks_done']} zadań "
+          f"({report['wasted']} zbędnych), {report['steals']} podziałów przy kradzieży, "
+          f"{report['reissued']} ponownie wydanych; {report['solver_nodes']} węzłów solvera, {report['time']:.2f} s")
+    for worker, count in report["workers"].items():
+        print(f"  {worker}: {count} zadań")
+
+
+async def kill_busy_worker(coordinator, processes, delay):
+    # Test ponownego wydawania zadań: po delay s zabija pierwszy proces, który właśnie liczy zadanie
+    # (czekanie na przydział, żeby nie zabić pracownika, zanim się połączy).
+    await asyncio.sleep(delay)
+    by_pid = {process.pid: process for process in processes}
+    while not coordinator.finished.is_set():
+        busy = [pid for pid in coordinator.busy_pids() if pid in by_pid]
+        if busy:
+            by_pid[busy[0]].kill()
+            print(f"Zabity pracownik {busy[0]} w trakcie zadania", flush=True)
+            return busy[0]
+        await asyncio.sleep(0.01)
+    return None
+
+
+async def coordinate(args, spawn=0, kill_after=None):
+    coordinator = Coordinator(3 * args.n, args.moves, args.split)
+    port = await coordinator.start(args.host, args.port)
+    print(f"Koordynator na {args.host}:{port}, {len(coordinator.queue)} zadań początkowych", flush=True)
+    processes = [subprocess.Popen([sys.executable, "-m", "rainbow_triplets.distributed", "worker",
+                                   "--host", args.host, "--port", str(port)]) for _ in range(spawn)]
+    killer = asyncio.create_task(kill_busy_worker(coordinator, processes, kill_after)) \
+        if kill_after is not None and processes else None
+    try:
+        await coordinator.finished.wait()
+        for process in processes:
+            while process.poll() is None:
+                await asyncio.sleep(WAIT_DELAY)
+    finally:
+        if killer is not None:
+            killer.cancel()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        await coordinator.close()
+    return coordinator
+
+
+def add_arguments(parser):
+    sub = parser.add_subparsers(dest="role", required=True)
+    for name, help_text in (("coordinator", "rozdziel analizę pozycji między pracowników"),
+                            ("local", "koordynator i pracownicy-procesy na tej maszynie (test)")):
+        role = sub.add_parser(name, help=help_text)
+        role.add_argument("moves", type=int, nargs="*", help="ruchy od początku partii")
+        role.add_argument("--n", type=int, default=5, help="plansza ma 3n pozycji")
+        role.add_argument("--split", type=int, default=2, help="głębokość podziału na zadania")
+        role.add_argument("--host", default="127.0.0.1")
+        role.add_argument("--port", type=int, default=0 if name == "local" else 8766)
+        if name == "local":
+            role.add_argument("--workers", type=int, default=3)
+            role.add_argument("--kill-after", type=float,
+                              help="po tylu sekundach zabij pracownika, który liczy zadanie (test ponownego wydania)")
+            role.add_argument("--verify", action="store_true", help="porównaj z solverem w jednym procesie")
+    worker = sub.add_parser("worker", help="pracownik łączący się z koordynatorem")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=8766)
+
+
+def run(args):
+    if args.role == "worker":
+        print(f"Pracownik: {work(args.host, args.port)} zadań", file=sys.stderr)
+        return 0
+    local = args.role == "local"
+    try:
+        coordinator = asyncio.run(coordinate(args, args.workers if local else 0,
+                                             args.kill_after if local else None))
+    except ValueError as e:
+        raise SystemExit(str(e))
+    report = coordinator.report()
+    print_report(report, coordinator.turn)
+    if local and args.verify:
+        board = IndexedBoard(3 * args.n)
+        for turn, m in enumerate(args.moves):
+            board.make(m, turn % 3)
+        start = time.perf_counter()
+        value, move, exact = Solver().solve(board, len(args.moves))
+        print(f"Solver w jednym procesie: wartość {value} ({time.perf_counter() - start:.2f} s) — "
+              f"{'zgodna' if value == report['value'] else 'NIEZGODNA'}")
+        return 0 if value == report["value"] else 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rozproszona analiza drzewa gry: koordynator i pracownicy po TCP.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
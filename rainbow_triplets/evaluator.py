@@ -0,0 +1,351 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from .forbidden import IndexedBoard
+from .heuristic import HeuristicEngine
+from .mcts import MCTS
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "evaluator.npz")
+HIDDEN = 32
+# Cechy pozycji (głowa wartości) i pola (głowa polityki) nie zależą od rozmiaru planszy,
+# więc jeden model obsługuje każde n.
+VALUE_FEATURES = 20
+CELL_FEATURES = 11
+
+
+def board_arrays(board, turn):
+    # counts[r] dla koloru (turn + r) % 3 — wiersz 0 to kolor gracza na ruchu — i maska pustych pól 1..size.
+    size = board.size
+    code = turn % 3
+    counts = np.array([board.counts[(code + r) % 3] for r in range(3)], dtype=np.int32)[:, 1:]
+    bits = np.frombuffer(board.occupied.to_bytes(size // 8 + 1, "little"), dtype=np.uint8)
+    empty = np.unpackbits(bits, bitorder="little")[1:size + 1] == 0
+    return counts, empty
+
+
+def value_features(board, turn):
+    # Rozkład pustych pól według tego, którym z trzech kolorów (względem gracza na ruchu) są zakazane,
+    # liczba pustych pól i jej parzystość, a dla każdego z trzech kolorów: liczba bezpiecznych pól, jej parzystość
+    # i odwrotność (rośnie gwałtownie, gdy kolorowi kończą się ruchy).
+    counts, empty = board_arrays(board, turn)
+    forbidden = counts[:, empty] > 0
+    pattern = forbidden[0] + 2 * forbidden[1] + 4 * forbidden[2]
+    size = board.size
+    empties = len(pattern)
+    safe = [board.safe[(turn + r) % 3] for r in range(3)]
+    features = np.empty(VALUE_FEATURES)
+    features[:8] = np.bincount(pattern, minlength=8) / max(1, empties)
+    features[8:11] = safe
+    features[8:11] /= size
+    features[11:14] = [s % 2 for s in safe]
+    features[14:17] = [1 / (1 + s) for s in safe]
+    features[17:] = (empties / size, empties % 2, 1.0)
+    return features
+
+
+def cell_features(board, turn, moves):
+    # Dla każdego pola z moves: zakazy trzech kolorów, ich iloczyny, log liczby ciągów, odległość od brzegu.
+    counts, _ = board_arrays(board, turn)
+    index = np.asarray(moves) - 1
+    cells = counts[:, index]
+    forbidden = (cells > 0).astype(np.float64)
+    features = np.empty((len(index), CELL_FEATURES))
+    features[:, 0:3] = forbidden.T
+    features[:, 3] = forbidden[0] * forbidden[1]
+    features[:, 4] = forbidden[0] * forbidden[2]
+    features[:, 5] = forbidden[1] * forbidden[2]
+    features[:, 6:9] = np.log1p(cells).T
+    features[:, 9] = np.minimum(index, board.size - 1 - index) / board.size
+    features[:, 10] = 1.0
+    return features
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+class Evaluator:
+    # Wartość: MLP z jedną warstwą ukrytą (tanh), wynik z perspektywy gracza, który wykonał poprzedni ruch —
+    # tak jak MCTS.simulate. Polityka: liniowy wynik pola, softmax po pustych polach.
+
+    def __init__(self, w1, b1, w2, b2, policy):
+        self.w1 = w1
+        self.b1 = b1
+        self.w2 = w2
+        self.b2 = b2
+        self.policy_weights = policy
+
+    @classmethod
+    def initial(cls, hidden=HIDDEN, seed=None):
+        rng = np.random.default_rng(seed)
+        return cls(rng.normal(0, 1 / np.sqrt(VALUE_FEATURES), (VALUE_FEATURES, hidden)), np.zeros(hidden),
+                   rng.normal(0, 1 / np.sqrt(hidden), hidden), np.zeros(1), np.zeros(CELL_FEATURES))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as data:
+            return cls(data["w1"], data["b1"], data["w2"], data["b2"], data["policy"])
+
+    def save(self, path=MODEL_PATH):
+        with open(path, "wb") as f:
+            np.savez(f, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2, policy=self.policy_weights)
+
+    def value_batch(self, features):
+        return sigmoid(np.tanh(features @ self.w1 + self.b1) @ self.w2 + self.b2)
+
+    def value(self, board, turn):
+        return float(self.value_batch(value_features(board, turn)[None])[0])
+
+    def policy(self, board, turn, moves):
+        return cell_features(board, turn, moves) @ self.policy_weights
+
+
+class EvaluatorMCTS(MCTS):
+    # MCTS z oceną liści przez Evaluator zamiast symulacji. Jedna iteracja zbiera `batch` liści — ścieżki
+    # dostają wirtualną przegraną (odwiedziny bez wygranej), żeby kolejne zejścia rozchodziły się po drzewie —
+    # i ocenia je jednym mnożeniem macierzy. Polityka ustala kolejność rozwijania dzieci.
+    # Oceny sieci są dużo bliższe 0.5 niż wyniki 0/1 symulacji, więc domyślna stała eksploracji jest mniejsza.
+
+    def __init__(self, evaluator, c=0.3, table=None, batch=16, widening=True, max_nodes=None):
+        super().__init__(c, table, smart_rollouts=True, widening=widening, max_nodes=max_nodes)
+        self.evaluator = evaluator
+        self.batch = batch
+        self.leaves = 0
+
+    def run(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        self.leaves = 0
+        return super().run(board, turn, iterations, time_limit, should_stop)
+
+    def iterate(self, root, board, turn):
+        paths, values, features = [], [], []
+        for _ in range(self.batch):
+            node, path, t = self.select(root, board, turn)
+            node, t = self.expand(node, path, board, t)
+            if node.terminal is None:
+                features.append(value_features(board, t))
+            values.append(node.terminal)
+            for n in path:
+                n.visits += 1
+            for n in reversed(path[1:]):
+                board.undo(n.move)
+            paths.append(path)
+        predicted = iter(self.evaluator.value_batch(np.array(features)).tolist() if features else ())
+        for path, value in zip(paths, values):
+            for n in path:
+                n.visits -= 1
+            self.backup(path, next(predicted) if value is None else value, 1)
+        self.leaves += len(paths)
+
+    def evaluate(self, board, turn):
+        # Pojedynczy liść (iterate_timed w trybie profile).
+        return self.evaluator.value(board, turn), 1
+
+    def untried_moves(self, board, turn):
+        # Najwyżej oceniony ruch na końcu listy, więc rozwijany jest pierwszy.
+        moves = board.empty_cells()
+        random.shuffle(moves)
+        order = np.argsort(self.evaluator.policy(board, turn, moves), kind="stable")
+        return [moves[i] for i in order]
+
+
+def self_play(games, sizes, epsilon=0.2, rollouts=16, seed=0):
+    # Partie heurystyki (z ruchami losowymi z prawdopodobieństwem epsilon). Dla każdej pozycji: cechy, cel
+    # wartości dla gracza, który wykonał poprzedni ruch, cechy pustych pól i indeks ruchu heurystyki wśród nich.
+    # Celem jest średnia z `rollouts` symulacji MCTS.simulate_safe z tej pozycji (0 — wynik partii): sam wynik
+    # partii heurystyki w środku gry jest prawie losowy, a średnia symulacji to dokładnie to, co sieć zastępuje.
+    random.seed(seed)
+    simulator = MCTS(smart_rollouts=True)
+    values, turns, results, cells, targets = [], [], [], [], []
+    for game in range(games):
+        size = sizes[game % len(sizes)]
+        board = IndexedBoard(size)
+        engine = HeuristicEngine()
+        start = len(turns)
+        turn = 0
+        loser = None
+        while board.empty_mask():
+            moves = board.empty_cells()
+            teacher = engine.choose(board, turn)
+            values.append(value_features(board, turn))
+            cells.append(cell_features(board, turn, moves))
+            targets.append(moves.index(teacher))
+            turns.append(turn)
+            if rollouts:
+                results.append(sum(simulator.simulate_safe(board, turn) for _ in range(rollouts)) / rollouts)
+            move = teacher
+            if random.random() < epsilon:
+                move = random.choice(board.safe_cells(turn % 3) or moves)
+            board.make(move, turn % 3)
+            engine.advance(move)
+            if board.triplet_at(move):
+                loser = turn % 2
+                break
+            turn += 1
+        if not rollouts:
+            for t in turns[start:]:
+                mover = (t - 1) % 2
+                results.append(0.5 if loser is None else float(mover != loser))
+    return np.array(values), np.array(results), cells, np.array(targets)
+
+
+def adam(params, grads, state, lr, step, beta1=0.9, beta2=0.999, eps=1e-8):
+    for p, g, (m, v) in zip(params, grads, state):
+        m *= beta1
+        m += (1 - beta1) * g
+        v *= beta2
+        v += (1 - beta2) * g * g
+        p -= lr * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+
+def train_value(model, x, y, epochs=30, batch=256, lr=0.01, seed=0):
+    # Entropia krzyżowa z miękkimi celami (remis = 0.5), minibatche i Adam.
+    rng = np.random.default_rng(seed)
+    params = [model.w1, model.b1, model.w2, model.b2]
+    state = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    step = 0
+    for _ in range(epochs):
+        order = rng.permutation(len(x))
+        for i in range(0, len(x), batch):
+            idx = order[i:i + batch]
+            xb, yb = x[idx], y[idx]
+            h = np.tanh(xb @ model.w1 + model.b1)
+            g = (sigmoid(h @ model.w2 + model.b2) - yb) / len(idx)
+            gh = np.outer(g, model.w2) * (1 - h * h)
+            step += 1
+            adam(params, [xb.T @ gh, gh.sum(axis=0), h.T @ g, np.array([g.sum()])], state, lr, step)
+
+
+def value_loss(model, x, y):
+    # Bez modelu: strata stałej prognozy y.mean() na tych samych danych.
+    p = np.clip(model.value_batch(x) if model is not None else np.full(len(y), y.mean()), 1e-7, 1 - 1e-7)
+    return float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean())
+
+
+def train_policy(model, cells, targets, epochs=200, lr=0.05):
+    # Softmax po pustych polach każdej pozycji (grupy różnej długości), pełny gradient i Adam.
+    x = np.concatenate(cells)
+    sizes = np.array([len(c) for c in cells])
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    chosen = starts + targets
+    state = [(np.zeros_like(model.policy_weights), np.zeros_like(model.policy_weights))]
+    for step in range(1, epochs + 1):
+        logits = x @ model.policy_weights
+        ex = np.exp(logits - np.repeat(np.maximum.reduceat(logits, starts), sizes))
+        prob = ex / np.repeat(np.add.reduceat(ex, starts), sizes)
+        prob[chosen] -= 1
+        adam([model.policy_weights], [x.T @ prob / len(cells)], state, lr, step)
+
+
+def policy_agreement(model, cells, targets):
+    return float(np.mean([np.argmax(c @ model.policy_weights) == t for c, t in zip(cells, targets)]))
+
+
+def play_match_game(size, engines, time_limit):
+    # engines[0] zaczyna; zwraca (wynik engines[0], iteracje lub liście na sekundę obu stron).
+    board = IndexedBoard(size)
+    work = [0, 0]
+    spent = [0.0, 0.0]
+    turn = 0
+    while board.empty_mask():
+        side = turn % 2
+        engine = engines[side]
+        start = time.perf_counter()
+        move = engine.search(board, turn, time_limit=time_limit)
+        spent[side] += time.perf_counter() - start
+        work[side] += engine.leaves if isinstance(engine, EvaluatorMCTS) else engine.iterations
+        board.make(move, turn % 3)
+        for e in engines:
+            e.advance(move)
+        if board.triplet_at(move):
+            return (0.0 if side == 0 else 1.0), work, spent
+        turn += 1
+    return 0.5, work, spent
+
+
+def bench(args):
+    model = Evaluator.load(args.model)
+    board = IndexedBoard(3 * args.n[0])
+    for m in random.Random(args.seed).sample(range(1, board.size + 1), board.size // 4):
+        if not board.counts[m % 3][m]:
+            board.make(m, m % 3)
+    features = np.array([value_features(board, 0)] * args.batch)
+    start = time.perf_counter()
+    for _ in range(200):
+        value_features(board, 0)
+    extract = (time.perf_counter() - start) / 200
+    start = time.perf_counter()
+    for _ in range(200):
+        model.value_batch(features)
+    infer = (time.perf_counter() - start) / 200 / args.batch
+    print(f"cechy: {extract * 1e6:.1f} µs/pozycję, ocena: {infer * 1e6:.2f} µs/pozycję (wsad {args.batch})")
+
+    random.seed(args.seed)
+    print(f"{'n':>5} {'partie':>7} {'wynik sieci':>12} {'liście/s sieć':>14} {'iteracje/s MCTS':>16}")
+    for n in args.n:
+        score, work, spent = 0.0, [0, 0], [0.0, 0.0]
+        for game in range(args.games):
+            net = EvaluatorMCTS(model, batch=args.batch)
+            rollouts = MCTS(smart_rollouts=True, rave=True, widening=True)
+            first = game % 2 == 0
+            result, w, s = play_match_game(3 * n, (net, rollouts) if first else (rollouts, net), args.time)
+            score += result if first else 1 - result
+            own = 0 if first else 1
+            work[0] += w[own]
+            work[1] += w[1 - own]
+            spent[0] += s[own]
+            spent[1] += s[1 - own]
+        print(f"{n:>5} {args.games:>7} {score / args.games:>12.2f} {work[0] / max(spent[0], 1e-9):>14.0f} "
+              f"{work[1] / max(spent[1], 1e-9):>16.0f}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocena pozycji siecią NumPy: uczenie z partii heurystyki i porównanie "
+                                                 "z MCTS na symulacjach.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="wygeneruj partie i naucz model")
+    train.add_argument("--games", type=int, default=400)
+    train.add_argument("--n", type=int, nargs="+", default=[10, 20, 30], help="rozmiary plansz (3n pozycji)")
+    train.add_argument("--epsilon", type=float, default=0.2, help="udział ruchów losowych w partiach")
+    train.add_argument("--rollouts", type=int, default=16,
+                       help="symulacje na pozycję jako cel wartości (0 = wynik partii)")
+    train.add_argument("--epochs", type=int, default=30)
+    train.add_argument("--hidden", type=int, default=HIDDEN)
+    train.add_argument("--seed", type=int, default=0)
+    train.add_argument("--out", default=MODEL_PATH)
+    compare = sub.add_parser("bench", help="siła przy równym czasie: MCTS z siecią kontra MCTS z symulacjami")
+    compare.add_argument("--model", default=MODEL_PATH)
+    compare.add_argument("--n", type=int, nargs="+", default=[10, 30])
+    compare.add_argument("--games", type=int, default=20)
+    compare.add_argument("--time", type=float, default=0.1, help="czas na ruch (s)")
+    compare.add_argument("--batch", type=int, default=16, help="liście oceniane naraz")
+    compare.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        bench(args)
+        return 0
+    start = time.perf_counter()
+    values, results, cells, targets = self_play(args.games, [3 * n for n in args.n], args.epsilon, args.rollouts,
+                                                args.seed)
+    print(f"{len(results)} pozycji z {args.games} partii w {time.perf_counter() - start:.1f} s")
+    split = len(results) * 9 // 10
+    model = Evaluator.initial(args.hidden, args.seed)
+    start = time.perf_counter()
+    train_value(model, values[:split], results[:split], args.epochs, seed=args.seed)
+    train_policy(model, cells[:split], targets[:split])
+    print(f"uczenie {time.perf_counter() - start:.1f} s; na odłożonych 10%: strata wartości "
+          f"{value_loss(model, values[split:], results[split:]):.3f} "
+          f"(stała prognoza: {value_loss(None, values[split:], results[split:]):.3f}), "
+          f"zgodność polityki z heurystyką {policy_agreement(model, cells[split:], targets[split:]):.0%}")
+    model.save(args.out)
+    print(f"zapisano {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+from .bitboard import Board
+
+
+class IndexedBoard(Board):
+    # Plansza z indeksem zakazanych kolorów: counts[c][x] to liczba ciągów przez x, w których pozostałe dwa pola
+    # mają już dwa różne kolory inne niż c — pole x jest dla koloru c zakazane, gdy counts[c][x] > 0.
+    # safe[c] to liczba pustych pól, na których kolor c nie tworzy tęczowego ciągu.
+    __slots__ = ('counts', 'safe')
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.counts = [[0] * (size + 1) for _ in range(3)]
+        self.safe = [size, size, size]
+
+    @classmethod
+    def from_board(cls, board):
+        indexed = cls(board.size)
+        for color in range(3):
+            mask = board.masks[color]
+            while mask:
+                low = mask & -mask
+                indexed.make(low.bit_length() - 1, color)
+                mask ^= low
+        return indexed
+
+    def copy(self):
+        board = super().copy()
+        board.counts = [c[:] for c in self.counts]
+        board.safe = self.safe[:]
+        return board
+
+    def make(self, pos, color):
+        self.update(pos, color, 1)
+        super().make(pos, color)
+        for c in range(3):
+            if not self.counts[c][pos]:
+                self.safe[c] -= 1
+
+    def undo(self, pos):
+        color = self[pos]
+        if color is None:
+            return
+        super().undo(pos)
+        self.update(pos, color, -1)
+        for c in range(3):
+            if not self.counts[c][pos]:
+                self.safe[c] += 1
+
+    def update(self, pos, color, delta):
+        # Każda para (pos, q) w dwóch różnych kolorach zakazuje trzeciego koloru na polach domykających ciąg.
+        size = self.size
+        occupied = self.occupied
+        for other in range(3):
+            if other == color:
+                continue
+            third = 3 - color - other
+            counts = self.counts[third]
+            safe = self.safe
+            mask = self.masks[other]
+            while mask:
+                low = mask & -mask
+                q = low.bit_length() - 1
+                mask ^= low
+                for x in (2 * pos - q, 2 * q - pos, (pos + q) // 2 if (pos + q) % 2 == 0 else 0):
+                    if x < 1 or x > size:
+                        continue
+                    before = counts[x]
+                    counts[x] = before + delta
+                    if not (occupied >> x) & 1:
+                        if delta > 0 and before == 0:
+                            safe[third] -= 1
+                        elif delta < 0 and before == 1:
+                            safe[third] += 1
+
+    def is_forbidden(self, pos, color):
+        return self.counts[color][pos] > 0
+
+    def forbidden_colors(self, pos):
+        return [c for c in range(3) if self.counts[c][pos]]
+
+    def safe_cells(self, color):
+        counts = self.counts[color]
+        return [x for x in self.empty_cells() if not counts[x]]
+
+    def safe_count(self, color):
+        return self.safe[color]
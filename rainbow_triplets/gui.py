@@ -0,0 +1,401 @@
+import os
+import sys
+import time
+import traceback
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QPushButton, QVBoxLayout,
+    QLabel, QMessageBox, QLineEdit, QComboBox, QCheckBox
+)
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QTimer, QThread, pyqtSignal
+
+from .ai import EVAL_MODE, choose_move, new_eval_engine, new_mcts_engine
+from .board_view import BoardView
+from .forbidden import IndexedBoard
+from .heuristic import HeuristicEngine
+from .book import OpeningBook
+from .mcts import MCTS
+
+AI_MODES = ["Losowy", "Heurystyczny", "MCTS", "Perfekcyjny", "MCTS-siec"]
+DEFAULT_TIME_LIMIT_MS = 1000
+BOOK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "book.bin")
+# Analiza w tle wysyła migawkę ocen co tyle sekund (i tylko gdy poprzednia została już narysowana).
+ANALYSIS_INTERVAL = 0.2
+# Po tylu odwiedzinach korzenia analiza się zatrzymuje, żeby drzewo nie rosło bez końca.
+ANALYSIS_MAX_VISITS = 200000
+# Nawet przy w pełni wykorzystanej analizie komputer dolicza ten ułamek swojego czasu.
+REPLY_MIN_FRACTION = 0.05
+# Pauza przed ruchem komputera (ms), gdy nie trwała analiza; kolory pól dla ruchów 0, 1, 2 (mod 3).
+REPLY_DELAY_MS = 500
+COLORS = ("red", "green", "blue")
+
+
+class StartWindow(QWidget):
+    def __init__(self, ai_modes=AI_MODES, instrumentation=None, analysis=False, **options):
+        super().__init__()
+        self.instrumentation = instrumentation
+        self.analysis = analysis
+        # wygląd i tempo planszy (reply_delay_ms, colors, columns, cell) przekazywane do RainbowTripletsGame
+        self.options = options
+        self.setWindowTitle("Tęczowe Trójki — Start")
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        self.label_n = QLabel("Podaj wartość n (liczba pozycji = 3n):")
+        self.layout.addWidget(self.label_n)
+
+        self.input_n = QLineEdit()
+        self.input_n.setPlaceholderText("np. 3")
+        self.layout.addWidget(self.input_n)
+
+        self.label_ai = QLabel("Wybierz tryb gry z komputerem:")
+        self.layout.addWidget(self.label_ai)
+
+        self.ai_selector = QComboBox()
+        self.ai_selector.addItems(ai_modes)
+        self.layout.addWidget(self.ai_selector)
+
+        self.label_budget = QLabel("Czas na ruch komputera w ms (MCTS, Perfekcyjny):")
+        self.layout.addWidget(self.label_budget)
+
+        self.input_budget = QLineEdit()
+        self.input_budget.setPlaceholderText(f"np. {DEFAULT_TIME_LIMIT_MS}")
+        self.layout.addWidget(self.input_budget)
+
+        self.label_workers = QLabel("Liczba procesów MCTS:")
+        self.layout.addWidget(self.label_workers)
+
+        self.input_workers = QLineEdit()
+        self.input_workers.setPlaceholderText("np. 1")
+        self.layout.addWidget(self.input_workers)
+
+        self.start_button = QPushButton("Start")
+        self.start_button.clicked.connect(self.start_game)
+        self.layout.addWidget(self.start_button)
+
+    def start_game(self):
+        try:
+            n = int(self.input_n.text())
+            if n < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Błąd", "Wprowadź poprawną liczbę całkowitą większą od zera.")
+            return
+
+        try:
+            budget = int(self.input_budget.text() or DEFAULT_TIME_LIMIT_MS)
+            if budget < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Błąd", "Czas na ruch musi być liczbą całkowitą większą od zera.")
+            return
+
+        try:
+            workers = int(self.input_workers.text() or 1)
+            if workers < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Błąd", "Liczba procesów musi być liczbą całkowitą większą od zera.")
+            return
+
+        ai_mode = self.ai_selector.currentText().lower()
+        try:
+            self.game_window = RainbowTripletsGame(size=3 * n, ai_mode=ai_mode, time_limit_ms=budget,
+                                                   workers=workers, instrumentation=self.instrumentation,
+                                                   analysis=self.analysis, **self.options)
+        except (ImportError, OSError) as e:
+            # tryb z siecią bez NumPy albo bez pliku modelu
+            QMessageBox.warning(self, "Błąd", f"Nie można uruchomić trybu {ai_mode}: {e}")
+            return
+        self.hide()
+        self.game_window.show()
+
+
+class SearchWorker(QThread):
+    # Liczy ruch komputera poza wątkiem GUI i oddaje go sygnałem move_ready.
+    move_ready = pyqtSignal(int)
+
+    def __init__(self, board, turn, ai_mode, iterations=None, time_limit=None, workers=1, engine=None,
+                 book=None, instrumentation=None, parent=None):
+        super().__init__(parent)
+        self.board = board.copy()
+        self.turn = turn
+        self.ai_mode = ai_mode
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.engine = engine
+        self.book = book
+        self.instrumentation = instrumentation
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            move = choose_move(self.board, self.turn, self.ai_mode, self.iterations, self.time_limit,
+                               should_stop=lambda: self.cancelled, workers=self.workers, engine=self.engine,
+                               book=self.book, instrumentation=self.instrumentation)
+        except Exception:
+            # Błąd silnika nie może zostawić zablokowanej planszy: ruch awaryjny, a drzewo (mogło zostać
+            # przerwane w połowie aktualizacji) idzie do kosza.
+            traceback.print_exc()
+            if getattr(self.engine, "root", None) is not None:
+                self.engine.root = None
+            move = fallback_move(self.board, self.turn)
+        if not self.cancelled and move is not None:
+            self.move_ready.emit(move)
+
+
+def fallback_move(board, turn):
+    # Pierwsze pole bezpieczne dla koloru na ruchu, a gdy takiego nie ma — pierwsze wolne.
+    cells = board.safe_cells(turn % 3) or board.empty_cells()
+    return cells[0] if cells else None
+
+
+def analysis_snapshot(root, turn, losing, rate):
+    # Oceny ruchów z korzenia: szansa wygranej gracza na ruchu i udział odwiedzin; rate — iteracje/s analizy.
+    total = sum(child.visits for child in root.children) or 1
+    cells = {child.move: (child.wins / child.visits, child.visits / total) for child in root.children if child.visits}
+    losing = list(losing) + [child.move for child in root.children if child.terminal == 0.0]
+    best = root.most_visited().move if root.children else None
+    return {"turn": turn, "cells": cells, "losing": losing, "best": best, "visits": root.visits, "rate": rate}
+
+
+class AnalysisWorker(QThread):
+    # Analiza pozycji, w której myśli człowiek: MCTS liczy porcjami po interval s, po każdej porcji wysyła migawkę.
+    # Nowa migawka idzie dopiero, gdy GUI narysowało poprzednią (pending), więc wolne odświeżanie nie tworzy kolejki.
+    updated = pyqtSignal(object)
+
+    def __init__(self, engine, board, turn, interval=ANALYSIS_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.board = board.copy()
+        self.turn = turn
+        self.interval = interval
+        self.cancelled = False
+        self.pending = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        board, turn = self.board, self.turn
+        code = turn % 3
+        # pola zakazane dla koloru gracza przegrywają od razu (o ile jest jakiekolwiek pole bezpieczne)
+        losing = [m for m in board.empty_cells() if board.counts[code][m]] if board.safe[code] else []
+        while not self.cancelled:
+            start = time.perf_counter()
+            root = self.engine.run(board, turn, time_limit=self.interval, should_stop=lambda: self.cancelled)
+            rate = self.engine.iterations / max(time.perf_counter() - start, 1e-9)
+            if not self.pending:
+                self.pending = True
+                self.updated.emit(analysis_snapshot(root, turn, losing, rate))
+            if root.visits >= ANALYSIS_MAX_VISITS or not root.children and root.untried == []:
+                break
+
+
+class RainbowTripletsGame(QWidget):
+    def __init__(self, size=9, ai_mode="losowy", time_limit_ms=DEFAULT_TIME_LIMIT_MS, iterations=None, workers=1,
+                 instrumentation=None, analysis=False, reply_delay_ms=REPLY_DELAY_MS, colors=COLORS, columns=None,
+                 cell=40):
+        super().__init__()
+        self.reply_delay_ms = reply_delay_ms
+        self.colors = colors
+        self.size = size
+        self.ai_mode = ai_mode
+        self.time_limit_ms = time_limit_ms
+        self.iterations = iterations
+        self.workers = workers
+        # silnik żyje przez całą partię: drzewo MCTS i cache heurystyki przechodzą między ruchami
+        self.engine = new_mcts_engine() \
+            if ai_mode == "mcts" and workers <= 1 else HeuristicEngine() if ai_mode == "heurystyczny" else None
+        if ai_mode == EVAL_MODE:
+            self.engine = new_eval_engine()
+        # księga otwarć/końcówek z book.py, jeśli została wygenerowana
+        self.book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+        # statystyki ruchów komputera (instrument.Instrumentation), np. log JSON-lines z `rainbow_triplets gui --log`
+        self.instrumentation = instrumentation
+        # analiza w tle używa drzewa silnika MCTS partii (ruch komputera korzysta wtedy z jej pracy),
+        # a przy innych trybach — własnego MCTS przesuwanego o każdy ruch
+        self.analysis_engine = self.engine if isinstance(self.engine, MCTS) else None
+        self.analysis_worker = None
+        self.analysis_rate = None
+        self.worker = None
+        self.thinking = False
+        self.setWindowTitle("Tęczowe Trójki")
+        self.current_turn = 0
+        self.board = IndexedBoard(size)
+
+        self.layout = QVBoxLayout()
+        self.label = QLabel("Tęczowe Trójki — Twój ruch")
+        self.layout.addWidget(self.label)
+
+        self.analysis_box = QCheckBox("Podpowiedzi: analiza pozycji w czasie Twojego ruchu")
+        self.analysis_box.setChecked(analysis)
+        self.analysis_box.toggled.connect(self.toggle_analysis)
+        self.layout.addWidget(self.analysis_box)
+
+        # jeden rysowany widżet zamiast przycisku na pole — czas budowy okna nie zależy od n
+        self.view = BoardView(size, [self.color_to_qcolor(code) for code in range(3)], cell, columns)
+        self.view.cell_clicked.connect(self.player_move)
+        self.layout.addWidget(self.view)
+
+        self.setLayout(self.layout)
+        self.start_analysis()
+
+    def color(self, turn_index):
+        return turn_index % 3
+
+    def color_to_qcolor(self, code):
+        return QColor(self.colors[code])
+
+    def is_valid(self, pos):
+        return self.board.is_empty(pos)
+
+    def set_move(self, pos):
+        code = self.color(self.current_turn)
+        self.board.make(pos, code)
+        if self.engine is not None:
+            self.engine.advance(pos)
+        if self.analysis_engine is not None and self.analysis_engine is not self.engine:
+            self.analysis_engine.advance(pos)
+        self.view.set_cell(pos, code)
+        self.current_turn += 1
+
+    def player_move(self, pos):
+        if self.thinking or not self.is_valid(pos):
+            return
+        analysed = self.stop_analysis()
+        self.set_move(pos)
+        triplet = self.find_rainbow_triplet(pos)
+        if triplet:
+            self.end_game("Przegrana", "Utworzyłeś tęczowy ciąg – przegrywasz!", triplet)
+            return
+        self.label.setText("Tęczowe Trójki — Ruch komputera")
+        self.thinking = True
+        QTimer.singleShot(0 if analysed else self.reply_delay_ms, self.computer_move)
+
+    def computer_move(self):
+        if not self.thinking:
+            return
+        if not self.board.empty_mask():
+            self.end_game("Remis", "Brak dostępnych ruchów.")
+            return
+        iterations, time_limit = self.reply_budget()
+        self.worker = SearchWorker(self.board, self.current_turn, self.ai_mode,
+                                   iterations, time_limit, self.workers, self.engine, self.book,
+                                   self.instrumentation, parent=self)
+        self.worker.move_ready.connect(self.apply_computer_move)
+        self.worker.start()
+
+    def apply_computer_move(self, choice):
+        self.worker.wait()
+        self.worker = None
+        self.thinking = False
+        self.set_move(choice)
+        triplet = self.find_rainbow_triplet(choice)
+        if triplet:
+            self.end_game("Wygrana", "Komputer utworzył tęczowy ciąg – wygrywasz!", triplet)
+            return
+        self.label.setText("Tęczowe Trójki — Twój ruch")
+        self.start_analysis()
+
+    def reply_budget(self):
+        # Budżet ruchu komputera pomniejszony o odwiedziny, które analiza zostawiła w poddrzewie ruchu gracza
+        # (tylko gdy analiza i komputer dzielą drzewo MCTS).
+        time_limit = self.time_limit_ms / 1000 if self.iterations is None else None
+        engine = self.engine
+        if self.analysis_rate is None or engine is not self.analysis_engine or engine.root is None:
+            return self.iterations, time_limit
+        reused = engine.root.visits
+        if self.iterations is not None:
+            return max(1, self.iterations - reused), None
+        expected = self.analysis_rate * time_limit
+        return None, time_limit * max(REPLY_MIN_FRACTION, 1 - reused / expected)
+
+    def toggle_analysis(self, checked):
+        if checked:
+            self.start_analysis()
+        else:
+            self.stop_analysis()
+            if not self.thinking and not self.view.locked:
+                self.label.setText("Tęczowe Trójki — Twój ruch")
+
+    def start_analysis(self):
+        if not self.analysis_box.isChecked() or self.analysis_worker is not None or self.thinking \
+                or self.view.locked or not self.board.empty_mask():
+            return
+        if self.analysis_engine is None:
+            self.analysis_engine = new_mcts_engine()
+        self.analysis_rate = None
+        self.analysis_worker = AnalysisWorker(self.analysis_engine, self.board, self.current_turn, parent=self)
+        self.analysis_worker.updated.connect(self.show_analysis)
+        self.analysis_worker.start()
+
+    def stop_analysis(self):
+        # Zwraca True, jeśli analiza działała (jej drzewo zostaje w silniku i przechodzi na następny ruch).
+        worker = self.analysis_worker
+        if worker is None:
+            return False
+        worker.cancel()
+        worker.wait()
+        self.analysis_worker = None
+        self.view.clear_analysis()
+        return True
+
+    def show_analysis(self, snapshot):
+        worker = self.analysis_worker
+        if worker is None or snapshot["turn"] != self.current_turn:
+            return
+        worker.pending = False
+        self.analysis_rate = snapshot["rate"]
+        self.view.set_analysis(snapshot["cells"], snapshot["losing"])
+        best = snapshot["best"]
+        if best is not None and best in snapshot["cells"]:
+            self.label.setText(f"Tęczowe Trójki — Twój ruch · analiza: najlepszy {best} "
+                               f"({snapshot['cells'][best][0]:.0%} wygranych), {snapshot['visits']} symulacji")
+
+    def find_rainbow_triplet(self, pos):
+        return self.board.triplet_at(pos)
+
+    @staticmethod
+    def find_triplet_static(board):
+        return board.find_triplet()
+
+    def closeEvent(self, event):
+        self.thinking = False
+        self.stop_analysis()
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+            self.worker = None
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        super().closeEvent(event)
+
+    def end_game(self, title, msg, triplet=None):
+        self.stop_analysis()
+        if triplet:
+            self.view.mark(triplet)
+        self.view.set_locked(True)
+        QMessageBox.information(self, title, msg)
+
+
+def run(argv=None, ai_modes=AI_MODES, size=None, ai_mode="losowy", instrumentation=None, analysis=False, **options):
+    # Bez size pokazuje okno startowe z wyborem n i trybu; z size od razu otwiera planszę.
+    # options (reply_delay_ms, colors, columns, cell) trafiają do RainbowTripletsGame.
+    app = QApplication(sys.argv if argv is None else argv)
+    if size is None:
+        window = StartWindow(ai_modes, instrumentation, analysis, **options)
+    else:
+        window = RainbowTripletsGame(size=size, ai_mode=ai_mode, instrumentation=instrumentation, analysis=analysis,
+                                     **options)
+    window.show()
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(run())
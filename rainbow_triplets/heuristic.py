@@ -0,0 +1,190 @@
+import random
+
+from .forbidden import IndexedBoard
+from .zobrist import TranspositionTable
+
+# Przy dwóch półruchach do głębszej oceny trafia tylu najlepszych kandydatów z oceny jednoruchowej.
+LOOKAHEAD_WIDTH = 8
+LOOKAHEAD_CAPACITY = 1 << 14
+
+
+def new_forbidden(board, m, color):
+    # Liczba pustych pól bezpiecznych dla następnego gracza, które ruch m w kolorze color uczyni zakazanymi:
+    # x tworzy ciąg z m i polem y w trzecim kolorze. Liczone wprost, bez make/undo.
+    size = board.size
+    occupied = board.occupied
+    counts = board.counts[(color + 1) % 3]
+    seen = set()
+    mask = board.masks[(color + 2) % 3]
+    while mask:
+        low = mask & -mask
+        y = low.bit_length() - 1
+        mask ^= low
+        for x in (2 * m - y, 2 * y - m, (m + y) // 2 if (m + y) % 2 == 0 else 0):
+            if 1 <= x <= size and not counts[x] and not (occupied >> x) & 1:
+                seen.add(x)
+    return len(seen)
+
+
+def reply_count(board, m, color, forbidden=None):
+    # Liczba bezpiecznych odpowiedzi rywala po ruchu m — to samo co make(m) + safe_count(następny kolor).
+    nxt = (color + 1) % 3
+    if forbidden is None:
+        forbidden = new_forbidden(board, m, color)
+    return board.safe[nxt] - (board.counts[nxt][m] == 0) - forbidden
+
+
+class HeuristicEngine:
+    # Heurystyka "zostaw rywalowi najmniej bezpiecznych odpowiedzi" z pamięcią między turami.
+    # cache[c][m] — ile bezpiecznych pól rywala zabierze ruch m w kolorze c; advance(board, move) usuwa tylko
+    # wpisy, na które ruch mógł wpłynąć. lookahead=2 ocenia też najlepszą odpowiedź rywala; wyniki pozycji
+    # po ruchu kandydata trzyma ograniczona tablica LRU (TranspositionTable).
+
+    def __init__(self, lookahead=1, table=None, width=LOOKAHEAD_WIDTH):
+        self.lookahead = lookahead
+        self.width = width
+        self.table = table if table is not None else TranspositionTable(LOOKAHEAD_CAPACITY)
+        self.cache = [{}, {}, {}]
+        # własna kopia pozycji, dla której cache jest aktualny (jak root_board w MCTS)
+        self.board = None
+        self.turn = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.resets = 0
+
+    def sync(self, board, turn):
+        # Pozycja inna niż śledzona (nowa partia, cofnięty ruch, brak advance) — cache od zera.
+        if self.board is not None and self.board.size == board.size and self.board.key == board.key:
+            return self.board
+        if any(self.cache):
+            self.resets += 1
+        self.cache = [{}, {}, {}]
+        self.board = board.copy() if isinstance(board, IndexedBoard) else IndexedBoard.from_board(board)
+        self.turn = turn
+        return self.board
+
+    def reply(self, board, m, color):
+        cache = self.cache[color]
+        forbidden = cache.get(m)
+        if forbidden is None:
+            self.misses += 1
+            forbidden = cache[m] = new_forbidden(board, m, color)
+        else:
+            self.hits += 1
+        return reply_count(board, m, color, forbidden)
+
+    def choose(self, board, turn):
+        index = self.sync(board, turn)
+        code = turn % 3
+        candidates = index.safe_cells(code) or index.empty_cells()
+        scored = [(self.reply(index, m, code), m) for m in candidates]
+        if self.lookahead >= 2 and len(scored) > 1:
+            return self.lookahead_move(index, code, scored)
+        best = min(score for score, _ in scored)
+        return random.choice([m for score, m in scored if score == best])
+
+    def lookahead_move(self, board, code, scored):
+        # Dwa półruchy: rywal odpowiada tak, żeby zostawić nam najmniej bezpiecznych pól; wybieramy ruch
+        # o największej różnicy "nasze pola po jego odpowiedzi − jego bezpieczne odpowiedzi".
+        scored.sort()
+        if scored[0][0] == 0:
+            return random.choice([m for score, m in scored if score == 0])
+        best, best_moves = None, []
+        for replies, m in scored[:self.width]:
+            key = (self.lookahead_value(board, m, code) - replies, -replies)
+            if best is None or key > best:
+                best, best_moves = key, [m]
+            elif key == best:
+                best_moves.append(m)
+        return random.choice(best_moves)
+
+    def lookahead_value(self, board, m, code):
+        board.make(m, code)
+        key = board.canonical_key()
+        value = self.table.get(key)
+        if value is None:
+            nxt = (code + 1) % 3
+            value = min(reply_count(board, r, nxt) for r in board.safe_cells(nxt))
+            self.table.put(key, value)
+        board.undo(m)
+        return value
+
+    def advance(self, pos):
+        # Ruch wykonany w partii. Wpis cache[c][m] zależy od pól trzeciego koloru w ciągach z m oraz od tego,
+        # które pola są puste i bezpieczne dla następnego gracza — usuwane są tylko wpisy, które ruch mógł zmienić.
+        board = self.board
+        if board is None:
+            return
+        k = self.turn % 3
+        board.make(pos, k)
+        self.turn += 1
+        if not any(self.cache):
+            return
+        size = board.size
+        occupied = board.occupied
+        dropped = 0
+        for cache in self.cache:
+            if cache.pop(pos, None) is not None:
+                dropped += 1
+
+        # 1. pos jest nowym polem y dla koloru c, w którym trzeci kolor to k
+        color = (k + 1) % 3
+        cache = self.cache[color]
+        counts = board.counts[(color + 1) % 3]
+        stale = []
+        for m in cache:
+            for x in (2 * m - pos, 2 * pos - m, (m + pos) // 2 if (m + pos) % 2 == 0 else 0):
+                if 1 <= x <= size and not counts[x] and not (occupied >> x) & 1:
+                    stale.append(m)
+                    break
+        for m in stale:
+            del cache[m]
+        dropped += len(stale)
+
+        # 2. pola, które przestały być puste i bezpieczne dla koloru t (w tym samo pos)
+        flipped = [(t, pos) for t in range(3) if not board.counts[t][pos]]
+        contributions = {}
+        for other in range(3):
+            if other == k:
+                continue
+            third = 3 - k - other
+            counts = board.counts[third]
+            mask = board.masks[other]
+            while mask:
+                low = mask & -mask
+                q = low.bit_length() - 1
+                mask ^= low
+                for x in (2 * pos - q, 2 * q - pos, (pos + q) // 2 if (pos + q) % 2 == 0 else 0):
+                    if 1 <= x <= size and not (occupied >> x) & 1:
+                        contributions[third, x] = contributions.get((third, x), 0) + 1
+        flipped.extend(tx for tx, added in contributions.items() if board.counts[tx[0]][tx[1]] == added)
+        for t, x in flipped:
+            color = (t - 1) % 3
+            cache = self.cache[color]
+            if not cache:
+                continue
+            mask = board.masks[(color + 2) % 3]
+            while mask:
+                low = mask & -mask
+                y = low.bit_length() - 1
+                mask ^= low
+                for m in (2 * x - y, 2 * y - x, (x + y) // 2 if (x + y) % 2 == 0 else 0):
+                    if cache.pop(m, None) is not None:
+                        dropped += 1
+        self.invalidations += dropped
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return {
+            "entries": sum(len(cache) for cache in self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "resets": self.resets,
+            "hit_rate": self.hit_rate(),
+            "lookahead": self.table.report(),
+        }
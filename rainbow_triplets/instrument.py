@@ -0,0 +1,114 @@
+import json
+
+PHASES = ("selection", "expansion", "simulation", "backpropagation")
+# Metody planszy liczone jako wywołania detektora (tęczowe ciągi i maski pól zakazanych).
+DETECTORS = ("triplet_at", "find_triplet", "forbidden", "safe_mask")
+
+_counting_classes = {}
+
+
+def counting_class(cls):
+    # Podklasa planszy bez nowych pól (__slots__ = ()), która zlicza wywołania detektorów w atrybucie klasy `calls`.
+    # Brak nowych pól pozwala podmienić __class__ istniejącej planszy, więc zwykła ścieżka nic nie płaci.
+    counted = _counting_classes.get(cls)
+    if counted is not None:
+        return counted
+
+    def wrap(name):
+        method = getattr(cls, name)
+
+        def counted_method(self, *args):
+            counted.calls += 1
+            return method(self, *args)
+
+        counted_method.__name__ = name
+        return counted_method
+
+    namespace = {"__slots__": (), "calls": 0}
+    namespace.update((name, wrap(name)) for name in DETECTORS)
+    counted = type(f"Counting{cls.__name__}", (cls,), namespace)
+    _counting_classes[cls] = counted
+    return counted
+
+
+def counting_copy(board):
+    board = board.copy()
+    board.__class__ = counting_class(type(board))
+    return board
+
+
+class MoveStats:
+    # Statystyki jednego ruchu komputera; pola nieużywane przez dany silnik zostają None.
+    __slots__ = ('mode', 'engine', 'size', 'turn', 'move', 'wall_time', 'iterations', 'nodes', 'rollouts',
+                 'rollouts_per_s', 'depth', 'detector_calls', 'exact', 'cache_hits', 'cache_misses',
+                 'invalidations', 'tree_nodes', 'recycled', 'tt_hits', 'tt_misses', 'tt_hit_rate') + PHASES
+
+    def __init__(self, mode, size, turn):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.mode = mode
+        self.engine = mode
+        self.size = size
+        self.turn = turn
+
+    def add_search(self, stats):
+        # Przepisuje słownik MCTS.stats (tryb profile).
+        self.engine = "mcts"
+        for name in PHASES + ("iterations", "nodes", "rollouts", "depth", "detector_calls"):
+            setattr(self, name, stats[name])
+        if stats["simulation"] > 0:
+            self.rollouts_per_s = stats["rollouts"] / stats["simulation"]
+
+    def add_solver(self, solver, exact, detector_calls):
+        self.engine = "solver"
+        self.nodes = solver.nodes
+        self.depth = solver.depth
+        self.exact = exact
+        self.detector_calls = detector_calls
+
+    def add_heuristic(self, engine):
+        # Liczniki HeuristicEngine od początku partii (trafienia i unieważnienia cache między turami).
+        self.cache_hits = engine.hits
+        self.cache_misses = engine.misses
+        self.invalidations = engine.invalidations
+        if engine.lookahead >= 2:
+            self.add_table(engine.table)
+
+    def add_table(self, table):
+        # Liczniki TranspositionTable od jej utworzenia (tablica silnika żyje przez całą partię).
+        self.tt_hits = table.hits
+        self.tt_misses = table.misses
+        self.tt_hit_rate = table.hit_rate()
+
+    def add_tree(self, engine):
+        # Rozmiar drzewa MCTS z ograniczoną pulą węzłów i liczba węzłów odzyskanych od początku pracy silnika.
+        report = engine.tree_report()
+        self.tree_nodes = report["nodes"]
+        self.recycled = report["recycled"]
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Instrumentation:
+    # Odbiorca MoveStats: wywołuje zarejestrowane funkcje i opcjonalnie dopisuje ruch do pliku JSON-lines.
+
+    def __init__(self, log_path=None):
+        self.listeners = []
+        self.log = open(log_path, "a") if log_path else None
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def emit(self, stats):
+        for listener in self.listeners:
+            listener(stats)
+        if self.log is not None:
+            self.log.write(json.dumps(stats.as_dict()) + "\n")
+            self.log.flush()
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from .ai import AI_MODES
+from .forbidden import IndexedBoard
+from .parallel_mcts import default_workers
+from .server import GameServer
+
+BUSY_BACKOFF = 0.05
+
+
+class LevelStats:
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.busy = 0
+        self.fallbacks = 0
+        self.errors = 0
+        self.latencies = []
+
+
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def client(host, port, n, ai_mode, time_limit, stop_at, stats, rng):
+    # Jeden gracz: partia za partią do stop_at; gra losowe pola bezpieczne, żeby partie nie kończyły się od razu.
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            response = await request(reader, writer, {"op": "new", "n": n, "ai": ai_mode, "time": time_limit})
+            session = response["session"]
+            board = IndexedBoard(3 * n)
+            while response.get("result") is None and time.perf_counter() < stop_at:
+                turn = response["turn"]
+                pos = rng.choice(board.safe_cells(turn % 3) or board.empty_cells())
+                start = time.perf_counter()
+                response = await request(reader, writer, {"op": "move", "session": session, "pos": pos})
+                if not response["ok"]:
+                    if response["error"] == "busy":
+                        stats.busy += 1
+                        await asyncio.sleep(BUSY_BACKOFF)
+                    else:
+                        stats.errors += 1
+                    response = {"turn": turn, "result": None}
+                    continue
+                board.make(pos, turn % 3)
+                if "ai_move" in response:
+                    stats.latencies.append(time.perf_counter() - start)
+                    stats.moves += 1
+                    stats.fallbacks += response["fallback"]
+                    board.make(response["ai_move"], (turn + 1) % 3)
+            if response.get("result") is not None:
+                stats.games += 1
+            await request(reader, writer, {"op": "close", "session": session})
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, clients, duration, n, ai_mode, time_limit, seed):
+    stats = LevelStats()
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(client(host, port, n, ai_mode, time_limit, stop_at, stats, random.Random(seed + i))
+                           for i in range(clients)))
+    return stats
+
+
+def percentile_ms(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * q // 100)] * 1000
+
+
+async def load_test(args):
+    server = None
+    host, port = args.host, args.port
+    if args.spawn:
+        server = GameServer(args.workers, args.queue)
+        port = await server.start(host, 0)
+    slo = args.slo if args.slo is not None else args.time * 1000 + 300
+    sustained = None
+    print(f"{'klienci':>8} {'partie':>7} {'ruchy/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'busy':>6} {'awaryjne':>9}")
+    try:
+        clients = 1
+        while clients <= args.max_clients:
+            stats = await run_level(host, port, clients, args.duration, args.n, args.ai, args.time, args.seed)
+            p50, p95 = percentile_ms(stats.latencies, 50), percentile_ms(stats.latencies, 95)
+            print(f"{clients:>8} {stats.games:>7} {stats.moves / args.duration:>8.1f} "
+                  f"{p50 or 0:>8.0f} {p95 or 0:>8.0f} {stats.busy:>6} {stats.fallbacks:>9}", flush=True)
+            if p95 is not None and p95 <= slo and not stats.busy and not stats.fallbacks and not stats.errors:
+                sustained = clients
+            clients *= 2
+    finally:
+        if server is not None:
+            await server.close()
+    if sustained is None:
+        print(f"Żaden poziom nie mieścił się w p95 ≤ {slo:.0f} ms bez odrzuceń.")
+    else:
+        print(f"Utrzymane: {sustained} równoczesnych partii (p95 ≤ {slo:.0f} ms, bez odrzuceń i ruchów awaryjnych).")
+    return sustained
+
+
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spawn", action="store_true", help="uruchom serwer w tym samym procesie na wolnym porcie")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="procesy puli przy --spawn")
+    parser.add_argument("--queue", type=int, help="limit kolejki przy --spawn")
+    parser.add_argument("--max-clients", type=int, default=64, help="liczba klientów rośnie 1, 2, 4, ... do tej wartości")
+    parser.add_argument("--duration", type=float, default=5.0, help="czas jednego poziomu (s)")
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--ai", choices=AI_MODES, default="mcts")
+    parser.add_argument("--time", type=float, default=0.1, help="czas ruchu komputera (s)")
+    parser.add_argument("--slo", type=float, help="próg p95 w ms (domyślnie czas ruchu + 300 ms)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run(args):
+    asyncio.run(load_test(args))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążenia serwera gry: ile partii naraz wytrzyma jedna maszyna.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
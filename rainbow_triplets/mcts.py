@@ -0,0 +1,408 @@
+import math
+import random
+import time
+
+from .forbidden import IndexedBoard
+from .instrument import PHASES, counting_copy
+
+
+class MCTSNode:
+    # Węzeł trzyma tylko swój ruch i statystyki; plansza jest wspólna dla całego drzewa.
+    # wins liczone z perspektywy gracza, który wykonał move.
+    __slots__ = ('move', 'children', 'untried', 'visits', 'wins', 'terminal', 'key', 'amaf_visits', 'amaf_wins')
+
+    def __init__(self, move=None):
+        self.reset(move)
+
+    def reset(self, move=None):
+        # Stan świeżego węzła; NodePool wywołuje to przy ponownym użyciu zwolnionego węzła.
+        self.move = move
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal = None  # None albo wynik (0 = przegrana, 0.5 = remis) dla gracza, który wykonał move
+        self.key = None  # kanoniczny klucz Zobrista pozycji, tylko gdy MCTS ma tablicę transpozycji
+        # statystyki RAVE/AMAF: wyniki symulacji, w których ten ruch zagrał później ten sam gracz
+        self.amaf_visits = 0
+        self.amaf_wins = 0.0
+
+    def is_fully_expanded(self):
+        return self.untried is not None and not self.untried
+
+    def ucb1(self, log_parent, c=1.41):
+        return self.wins / self.visits + c * math.sqrt(log_parent / self.visits)
+
+    def best_child(self, c=1.41):
+        log_parent = math.log(self.visits)
+        return max(self.children, key=lambda child: child.ucb1(log_parent, c))
+
+    def rave_child(self, c, k):
+        # UCB1 z wartością mieszaną z AMAF; waga beta maleje wraz z liczbą odwiedzin dziecka.
+        log_parent = math.log(self.visits)
+
+        def score(child):
+            q = child.wins / child.visits
+            if child.amaf_visits:
+                beta = math.sqrt(k / (3 * child.visits + k))
+                q = (1 - beta) * q + beta * child.amaf_wins / child.amaf_visits
+            return q + c * math.sqrt(log_parent / child.visits)
+        return max(self.children, key=score)
+
+    def most_visited(self):
+        return max(self.children, key=lambda child: child.visits)
+
+
+class NodePool:
+    # Węzły zaalokowane z góry (capacity sztuk). Zwolnione poddrzewa wracają na listę wolnych i są używane ponownie;
+    # recycled liczy węzły zwolnione w czasie pracy (przycięte poddrzewa i drzewo porzucone po ruchu).
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.free = [MCTSNode() for _ in range(capacity)]
+        self.recycled = 0
+
+    def acquire(self, move):
+        node = self.free.pop()
+        node.reset(move)
+        return node
+
+    def release(self, node):
+        stack = [node]
+        released = 0
+        while stack:
+            n = stack.pop()
+            stack.extend(n.children)
+            n.children = []
+            self.free.append(n)
+            released += 1
+        self.recycled += released
+        return released
+
+    def in_use(self):
+        return self.capacity - len(self.free)
+
+
+class MCTS:
+    # Progresywne poszerzanie: węzeł o N odwiedzinach ma co najwyżej 1 + WIDENING_C * N^WIDENING_ALPHA dzieci.
+    WIDENING_C = 2.0
+    WIDENING_ALPHA = 0.5
+    # Przy wyczerpaniu puli węzłów zwalniana jest co najmniej taka część jej pojemności.
+    PRUNE_FRACTION = 0.25
+
+    def __init__(self, c=1.41, table=None, smart_rollouts=False, rave=False, rave_k=300, widening=False,
+                 max_nodes=None):
+        self.c = c
+        # smart_rollouts: symulacje wybierają tylko pola bezpieczne według indeksu zakazanych kolorów
+        self.smart_rollouts = smart_rollouts
+        # rave: wybór dziecka miesza UCB1 ze statystykami AMAF (rave_k = liczba odwiedzin, przy której wagi są równe)
+        self.rave = rave
+        self.rave_k = rave_k
+        # widening: dzieci rozwijane stopniowo, najpierw ruchy bezpieczne
+        self.widening = widening
+        self.rollout_moves = []
+        # Opcjonalna TranspositionTable: pozycje równoważne (także lustrzane) dzielą statystyki (visits, wins).
+        self.table = table
+        self.iterations = 0
+        # Drzewo z poprzedniego ruchu — używane ponownie, jeśli search dostanie tę samą pozycję.
+        self.root = None
+        self.root_board = None
+        self.root_turn = None
+        self.reused_nodes = 0
+        # profile: run() mierzy czas faz i liczniki w self.stats (iterate_timed); wyłączone nic nie kosztuje.
+        self.profile = False
+        self.stats = None
+        # max_nodes: drzewo ma co najwyżej tyle węzłów (pula alokowana z góry); gdy pula się kończy, najrzadziej
+        # odwiedzane poddrzewa są zwijane do liści z zachowaniem ich statystyk, a ich węzły wracają do puli.
+        if max_nodes is not None and max_nodes < 2:
+            raise ValueError("max_nodes musi być co najmniej 2 (korzeń i jedno dziecko)")
+        self.pool = NodePool(max_nodes) if max_nodes else None
+        self.pruned = 0
+        # False po przycinaniu, które nic nie zwolniło: przy pustej puli drzewo się nie zmienia (liście są oceniane
+        # bez rozwijania), więc kolejna próba też by nic nie dała — aż do zmiany korzenia.
+        self.prunable = True
+
+    def search(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        # Przeszukiwanie "anytime": kończy się po iterations iteracjach, po time_limit sekundach
+        # albo gdy should_stop() zwróci True — co nastąpi pierwsze.
+        root = self.run(board, turn, iterations, time_limit, should_stop)
+        if not root.children:
+            return None
+        return root.most_visited().move
+
+    def run(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        if self.root is None or self.root_turn != turn or self.root_board != board:
+            if self.root is not None and self.pool is not None:
+                self.pool.release(self.root)
+            self.root = self.new_node(None, board)
+            self.root_board = board.copy()
+            self.root_turn = turn
+            self.reused_nodes = 0
+            self.prunable = True
+        root = self.root
+        if self.smart_rollouts and not isinstance(board, IndexedBoard):
+            board = IndexedBoard.from_board(board)
+        else:
+            board = board.copy()
+        self.iterations = 0
+        step = self.iterate
+        if self.profile:
+            step = self.iterate_timed
+            self.stats = dict.fromkeys(PHASES, 0.0)
+            self.stats.update(nodes=0, rollouts=0, depth=0)
+            board = counting_copy(board)
+            type(board).calls = 0
+        while iterations is None or self.iterations < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if should_stop is not None and should_stop():
+                break
+            if self.pool is not None and not self.pool.free and self.prunable:
+                self.prunable = self.prune(root) > 0
+            step(root, board, turn)
+            self.iterations += 1
+        if self.profile:
+            self.stats["iterations"] = self.iterations
+            self.stats["detector_calls"] = type(board).calls
+        return root
+
+    def advance(self, move):
+        # Przesuwa korzeń o wykonany ruch; poddrzewo tego ruchu zostaje, reszta drzewa jest zwalniana.
+        if self.root is None:
+            return
+        child = next((c for c in self.root.children if c.move == move), None)
+        self.root_board.make(move, self.root_turn % 3)
+        self.root_turn += 1
+        self.prunable = True
+        if self.pool is not None:
+            # porzucona część drzewa wraca do puli; poddrzewo ruchu zostaje
+            if child is not None:
+                self.root.children.remove(child)
+            self.pool.release(self.root)
+        if child is None:
+            self.root = self.new_node(None, self.root_board)
+            self.reused_nodes = 0
+        else:
+            self.root = child
+            self.reused_nodes = count_nodes(child)
+
+    def new_node(self, move, board):
+        node = MCTSNode(move) if self.pool is None else self.pool.acquire(move)
+        if self.table is not None:
+            node.key = board.canonical_key()
+            stats = self.table.get(node.key)
+            if stats is not None:
+                node.visits, node.wins = stats
+        return node
+
+    def iterate(self, root, board, turn):
+        # Jedna iteracja na wspólnej planszy: ruchy ścieżki są cofane na końcu.
+        node, path, t = self.select(root, board, turn)
+        node, t = self.expand(node, path, board, t)
+        self.rollout_moves = []
+        if node.terminal is not None:
+            wins, count = node.terminal, 1
+        else:
+            wins, count = self.evaluate(board, t)
+        self.backpropagate(path, wins, count, board)
+
+    def iterate_timed(self, root, board, turn):
+        # Jak iterate, ale z pomiarem czasu faz i licznikami do self.stats (tryb profile).
+        stats = self.stats
+        clock = time.perf_counter
+        start = clock()
+        node, path, t = self.select(root, board, turn)
+        selected = clock()
+        depth = len(path)
+        node, t = self.expand(node, path, board, t)
+        expanded = clock()
+        self.rollout_moves = []
+        if node.terminal is not None:
+            wins, count = node.terminal, 1
+        else:
+            wins, count = self.evaluate(board, t)
+            stats["rollouts"] += count
+        simulated = clock()
+        self.backpropagate(path, wins, count, board)
+        stats["selection"] += selected - start
+        stats["expansion"] += expanded - selected
+        stats["simulation"] += simulated - expanded
+        stats["backpropagation"] += clock() - simulated
+        stats["nodes"] += len(path) - depth
+        stats["depth"] = max(stats["depth"], len(path) - 1)
+
+    def select(self, root, board, turn):
+        node = root
+        path = [root]
+        t = turn
+        while node.children and (node.is_fully_expanded() or self.widening and not self.can_widen(node)):
+            node = node.rave_child(self.c, self.rave_k) if self.rave else node.best_child(self.c)
+            board.make(node.move, t % 3)
+            t += 1
+            path.append(node)
+        return node, path, t
+
+    def expand(self, node, path, board, t):
+        if node.terminal is None:
+            if node.untried is None:
+                node.untried = self.untried_moves(board, t)
+            # pusta pula (przycinanie nic nie zwolniło): liść oceniany bez rozwijania
+            if node.untried and (self.pool is None or self.pool.free):
+                move = node.untried.pop()
+                board.make(move, t % 3)
+                t += 1
+                child = self.new_node(move, board)
+                if board.triplet_at(child.move):
+                    child.terminal = 0.0
+                elif not board.empty_mask():
+                    child.terminal = 0.5
+                node.children.append(child)
+                node = child
+                path.append(node)
+        return node, t
+
+    def prune(self, root):
+        # Zwija do liści węzły wewnętrzne (poza korzeniem) od najrzadziej odwiedzanych, aż zwolni PRUNE_FRACTION puli.
+        # Zwinięty węzeł zachowuje visits/wins, a przy ponownym wyborze jest rozwijany od nowa.
+        inner = []
+        stack = list(root.children)
+        while stack:
+            n = stack.pop()
+            if n.children:
+                inner.append(n)
+                stack.extend(n.children)
+        inner.sort(key=lambda n: n.visits)
+        target = max(1, int(self.pool.capacity * self.PRUNE_FRACTION))
+        freed = 0
+        for n in inner:
+            if freed >= target:
+                break
+            if not n.children:
+                continue  # zwolniony razem z wcześniej zwiniętym przodkiem
+            for child in n.children:
+                freed += self.pool.release(child)
+            n.children = []
+            n.untried = None
+            self.pruned += 1
+        return freed
+
+    def tree_report(self):
+        if self.pool is None:
+            return {"nodes": count_nodes(self.root) if self.root is not None else 0}
+        return {"nodes": self.pool.in_use(), "capacity": self.pool.capacity, "recycled": self.pool.recycled,
+                "pruned": self.pruned}
+
+    def backpropagate(self, path, wins, count, board):
+        self.backup(path, wins, count)
+        for n in path[1:]:
+            board.undo(n.move)
+
+    def backup(self, path, wins, count):
+        # Aktualizacja statystyk ścieżki, bez cofania ruchów na planszy.
+        if self.rave:
+            self.update_amaf(path, wins, count)
+        for n in reversed(path):
+            n.visits += count
+            n.wins += wins
+            wins = count - wins
+            if n.key is not None:
+                self.table.put(n.key, (n.visits, n.wins))
+
+    def can_widen(self, node):
+        allowed = 1 + int(self.WIDENING_C * node.visits ** self.WIDENING_ALPHA)
+        return bool(node.untried) and len(node.children) < allowed
+
+    def untried_moves(self, board, turn):
+        # Lista do zdejmowania pop(): przy poszerzaniu ruchy bezpieczne trafiają na koniec, więc są rozwijane najpierw.
+        moves = board.empty_cells()
+        random.shuffle(moves)
+        if self.widening:
+            if isinstance(board, IndexedBoard):
+                counts = board.counts[turn % 3]
+                moves.sort(key=lambda m: counts[m] == 0)
+            else:
+                safe = board.safe_mask(turn % 3)
+                moves.sort(key=lambda m: (safe >> m) & 1)
+        return moves
+
+    def update_amaf(self, path, wins, count):
+        # Sekwencja ruchów od korzenia: ścieżka w drzewie, potem symulacja. Dziecko węzła na głębokości d dostaje
+        # wynik, jeśli jego ruch padł na pozycji i >= d o tej samej parzystości (ten sam gracz).
+        order = {}
+        for i, move in enumerate([n.move for n in path[1:]] + self.rollout_moves):
+            order.setdefault(move, i)
+        # wins jest z perspektywy autora ostatniego ruchu ścieżki (pozycja len(path) - 2); value — gracza z pozycji 0
+        value = wins if (len(path) - 2) % 2 == 0 else count - wins
+        for d, n in enumerate(path[:-1]):
+            v = value if d % 2 == 0 else count - value
+            for child in n.children:
+                i = order.get(child.move)
+                if i is not None and i >= d and (i - d) % 2 == 0:
+                    child.amaf_visits += count
+                    child.amaf_wins += v
+
+    def evaluate(self, board, turn):
+        # Zwraca (suma wyników, liczba symulacji) dla liścia; podklasy mogą grać wiele rozgrywek naraz.
+        return self.simulate(board, turn), 1
+
+    def simulate(self, board, turn):
+        # Losowa rozgrywka od pozycji, w której ruch ma gracz tury `turn`.
+        # Wynik z perspektywy gracza, który wykonał poprzedni ruch.
+        if self.smart_rollouts:
+            return self.simulate_safe(board, turn)
+        moves = board.empty_cells()
+        random.shuffle(moves)
+        result = 0.5  # remis
+        t = turn
+        played = 0
+        for move in moves:
+            board.make(move, t % 3)
+            played += 1
+            if board.triplet_at(move):
+                result = 1.0 if (t - turn) % 2 == 0 else 0.0
+                break
+            t += 1
+        for move in moves[:played]:
+            board.undo(move)
+        if self.rave:
+            self.rollout_moves = moves[:played]
+        return result
+
+    def simulate_safe(self, board, turn):
+        # Jak simulate, ale na IndexedBoard: gracz gra losowe pole bezpieczne, a gdy takiego nie ma — przegrywa.
+        moves = board.empty_cells()
+        random.shuffle(moves)
+        result = 0.5  # remis
+        t = turn
+        played = []
+        while moves:
+            counts = board.counts[t % 3]
+            for i, move in enumerate(moves):
+                if not counts[move]:
+                    break
+            else:
+                result = 1.0 if (t - turn) % 2 == 0 else 0.0
+                break
+            moves[i] = moves[-1]
+            moves.pop()
+            board.make(move, t % 3)
+            played.append(move)
+            t += 1
+        for move in reversed(played):
+            board.undo(move)
+        if self.rave:
+            self.rollout_moves = played
+        return result
+
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        count += 1
+        stack.extend(n.children)
+    return count
@@ -0,0 +1,161 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .bitboard import Board
+from .forbidden import IndexedBoard
+from .mcts import MCTS
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def worker_engine():
+    # Ta sama konfiguracja co silnik jednoprocesowy (ai.new_mcts_engine), żeby więcej procesów nie znaczyło słabszej gry.
+    return MCTS(smart_rollouts=True, rave=True, widening=True)
+
+
+def _search_root(board, turn, iterations, time_limit, seed):
+    # Uruchamiane w procesie roboczym: niezależne drzewo, zwracamy tylko statystyki korzenia.
+    random.seed(seed)
+    engine = worker_engine()
+    root = engine.run(board, turn, iterations, time_limit)
+    return {child.move: (child.visits, child.wins) for child in root.children}, engine.iterations
+
+
+def _batch_rollouts(board, turn, count, seed):
+    random.seed(seed)
+    engine = worker_engine()
+    if not isinstance(board, IndexedBoard):
+        board = IndexedBoard.from_board(board)
+    return sum(engine.simulate(board, turn) for _ in range(count))
+
+
+def merge_root_stats(results):
+    merged = {}
+    for stats in results:
+        for move, (visits, wins) in stats.items():
+            v, w = merged.get(move, (0, 0.0))
+            merged[move] = (v + visits, w + wins)
+    return merged
+
+
+class RootParallelMCTS:
+    # Równoległość korzenia: każdy proces buduje własne drzewo, na końcu sumujemy odwiedziny ruchów z korzenia.
+    def __init__(self, workers=None, executor=None):
+        self.workers = workers or default_workers()
+        self.executor = executor
+        self.iterations = 0
+
+    def search(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        stats = self.root_stats(board, turn, iterations, time_limit, should_stop)
+        if not stats:
+            return None
+        return max(stats, key=lambda move: stats[move][0])
+
+    def root_stats(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        per_worker = None if iterations is None else -(-iterations // self.workers)
+        executor = self.executor or ProcessPoolExecutor(self.workers)
+        cancelled = False
+        try:
+            pending = {executor.submit(_search_root, board, turn, per_worker, time_limit, random.getrandbits(64))
+                       for _ in range(self.workers)}
+            results = []
+            self.iterations = 0
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats, count = future.result()
+                    results.append(stats)
+                    self.iterations += count
+                if pending and should_stop is not None and should_stop():
+                    cancelled = True
+                    for future in pending:
+                        future.cancel()
+                    return {}
+            return merge_root_stats(results)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=not cancelled, cancel_futures=True)
+
+
+class LeafParallelMCTS(MCTS):
+    # Równoległość liści: jedno drzewo, a z każdego liścia rozgrywamy paczkę symulacji na wielu procesach.
+    # Symulacje bezpieczne jak w worker_engine; RAVE odpada, bo z procesów wracają tylko wyniki, bez ruchów.
+    def __init__(self, workers=None, batch=None, executor=None, c=1.41):
+        super().__init__(c, widening=True)
+        self.workers = workers or default_workers()
+        self.batch = batch or self.workers
+        self.executor = executor
+
+    def run(self, board, turn, iterations=None, time_limit=None, should_stop=None):
+        own = self.executor is None
+        if own:
+            self.executor = ProcessPoolExecutor(self.workers)
+        try:
+            return super().run(board, turn, iterations, time_limit, should_stop)
+        finally:
+            if own:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+
+    def evaluate(self, board, turn):
+        chunk, extra = divmod(self.batch, self.workers)
+        futures = [self.executor.submit(_batch_rollouts, board, turn, chunk + (i < extra), random.getrandbits(64))
+                   for i in range(min(self.workers, self.batch))]
+        return sum(f.result() for f in futures), self.batch
+
+
+def measure_speedup(size, time_limit=2.0, worker_counts=(1, 2, 4, 8), mode="root", seed=0):
+    # Przyspieszenie liczone jako stosunek liczby symulacji na sekundę do wyniku dla jednego procesu.
+    random.seed(seed)
+    board = Board(size)
+    rows = []
+    base = None
+    for workers in worker_counts:
+        with ProcessPoolExecutor(workers) as executor:
+            if mode == "root":
+                engine = RootParallelMCTS(workers, executor)
+                start = time.perf_counter()
+                engine.root_stats(board, 0, time_limit=time_limit)
+                rollouts = engine.iterations
+            else:
+                engine = LeafParallelMCTS(workers, executor=executor)
+                start = time.perf_counter()
+                root = engine.run(board, 0, time_limit=time_limit)
+                rollouts = root.visits
+            elapsed = time.perf_counter() - start
+        rate = rollouts / elapsed
+        base = base or rate
+        rows.append((workers, rollouts, rate, rate / base))
+    return rows
+
+
+def add_arguments(parser):
+    parser.add_argument("--n", type=int, default=30, help="plansza ma 3n pozycji")
+    parser.add_argument("--time", type=float, default=2.0, help="czas przeszukiwania w sekundach")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", choices=["root", "leaf"], default="root")
+
+
+def run(args):
+    print(f"{'procesy':>8} {'symulacje':>10} {'sym/s':>10} {'przysp.':>8}")
+    for workers, rollouts, rate, speedup in measure_speedup(3 * args.n, args.time, args.workers, args.mode):
+        print(f"{workers:>8} {rollouts:>10} {rate:>10.0f} {speedup:>8.2f}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Przyspieszenie równoległego MCTS względem jednego procesu.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import argparse
+import random
+import sys
+import time
+
+from .bitboard import Board
+from .mcts import MCTS
+
+
+def play_game(size, engines, budgets, cpu):
+    # engines[0] zaczyna; zwraca wynik gracza 0 (1 wygrana, 0 przegrana, 0.5 remis).
+    board = Board(size)
+    turn = 0
+    while board.empty_mask():
+        side = turn % 2
+        start = time.process_time()
+        move = engines[side]().search(board, turn, budgets[side])
+        cpu[side] += time.process_time() - start
+        board.make(move, turn % 3)
+        if board.triplet_at(move):
+            return 0.0 if side == 0 else 1.0
+        turn += 1
+    return 0.5
+
+
+def match(size, candidate, baseline, candidate_budget, baseline_budget, games):
+    # Partie na zmianę z pierwszym ruchem; wynik i czas procesora z perspektywy kandydata.
+    score = 0.0
+    cpu = [0.0, 0.0]
+    for game in range(games):
+        if game % 2 == 0:
+            side_cpu = [0.0, 0.0]
+            score += play_game(size, (candidate, baseline), (candidate_budget, baseline_budget), side_cpu)
+            cpu[0] += side_cpu[0]
+            cpu[1] += side_cpu[1]
+        else:
+            side_cpu = [0.0, 0.0]
+            score += 1 - play_game(size, (baseline, candidate), (baseline_budget, candidate_budget), side_cpu)
+            cpu[0] += side_cpu[1]
+            cpu[1] += side_cpu[0]
+    return score / games, cpu
+
+
+def add_arguments(parser):
+    parser.add_argument("--n", type=int, default=10, help="plansza ma 3n pozycji")
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[50, 100, 200], help="iteracje kandydata na ruch")
+    parser.add_argument("--ratio", type=int, default=10, help="ile razy więcej iteracji dostaje UCB1")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run(args):
+    random.seed(args.seed)
+    candidate = lambda: MCTS(rave=True, widening=True, smart_rollouts=True)
+    baseline = lambda: MCTS()
+    print(f"{'iter. RAVE':>10} {'iter. UCB1':>10} {'wynik RAVE':>10} {'CPU RAVE [s]':>12} {'CPU UCB1 [s]':>12}")
+    for budget in args.budgets:
+        score, cpu = match(3 * args.n, candidate, baseline, budget, budget * args.ratio, args.games)
+        print(f"{budget:>10} {budget * args.ratio:>10} {score:>10.2f} {cpu[0]:>12.2f} {cpu[1]:>12.2f}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Siła MCTS z RAVE i progresywnym poszerzaniem względem zwykłego UCB1.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+
+from .bitboard import Board
+
+# Plik: nagłówek, potem niezależne bloki: nagłówek bloku (długość skompresowana, długość po rozpakowaniu,
+# liczba partii, crc32 danych) i dane skompresowane zlib. W danych partie jedna po drugiej, każda poprzedzona
+# swoją długością (varint): varint rozmiar planszy, varint długość + konfiguracja (JSON), bajt wyniku,
+# varint liczba ruchów, ruchy (varint).
+# Plik jest tylko dopisywany; urwany ostatni blok (np. po przerwanym zapisie) czytelnik pomija.
+MAGIC = b"RTGR"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+BLOCK = struct.Struct("<IIII")
+BLOCK_SIZE = 1 << 16
+
+DRAW, FIRST_LOST, SECOND_LOST, UNFINISHED = 0, 1, 2, 3
+RESULTS = ("remis", "przegrywa gracz 1", "przegrywa gracz 2", "nieukończona")
+
+
+class RecordError(ValueError):
+    pass
+
+
+def write_varint(buf, value):
+    while value >= 0x80:
+        buf.append(value & 0x7F | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def result_of(moves, lost):
+    # Kod wyniku z listy ruchów: lost — czy ostatni ruch utworzył tęczowy ciąg.
+    if lost:
+        return FIRST_LOST if len(moves) % 2 == 1 else SECOND_LOST
+    return DRAW
+
+
+def scan_blocks(f):
+    # Indeks bloków (przesunięcie, numer pierwszej partii, liczba partii) z samych nagłówków
+    # oraz koniec ostatniego pełnego bloku.
+    end = os.fstat(f.fileno()).st_size
+    blocks = []
+    offset, first = HEADER.size, 0
+    while offset + BLOCK.size <= end:
+        f.seek(offset)
+        compressed, raw, count, crc = BLOCK.unpack(f.read(BLOCK.size))
+        if offset + BLOCK.size + compressed > end:
+            break
+        blocks.append((offset, first, count))
+        first += count
+        offset += BLOCK.size + compressed
+    return blocks, offset
+
+
+def check_header(f, path):
+    magic, version = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise RecordError(f"{path}: to nie jest plik zapisu partii w wersji {VERSION}")
+
+
+class GameRecord:
+    __slots__ = ('size', 'moves', 'result', 'config')
+
+    def __init__(self, size, moves, result, config=None):
+        self.size = size
+        self.moves = moves
+        self.result = result
+        self.config = config
+
+    def __repr__(self):
+        return f"GameRecord(size={self.size}, moves={len(self.moves)}, result={RESULTS[self.result]!r})"
+
+    def encode(self, buf):
+        write_varint(buf, self.size)
+        config = json.dumps(self.config, separators=(",", ":")).encode() if self.config else b""
+        write_varint(buf, len(config))
+        buf += config
+        buf.append(self.result)
+        write_varint(buf, len(self.moves))
+        for m in self.moves:
+            write_varint(buf, m)
+
+    @classmethod
+    def decode(cls, data, pos):
+        size, pos = read_varint(data, pos)
+        length, pos = read_varint(data, pos)
+        config = json.loads(bytes(data[pos:pos + length])) if length else None
+        pos += length
+        result = data[pos]
+        count, pos = read_varint(data, pos + 1)
+        moves = []
+        for _ in range(count):
+            m, pos = read_varint(data, pos)
+            moves.append(m)
+        return cls(size, moves, result, config), pos
+
+    def replay(self, ply=None, verify=True):
+        # Plansza po `ply` ruchach (domyślnie po całej partii). Z verify każdy ruch sprawdzany jest
+        # przyrostowo (triplet_at tylko przez nowe pole), a przy pełnym odtworzeniu także zapisany wynik.
+        if ply is None:
+            ply = len(self.moves)
+        if not 0 <= ply <= len(self.moves):
+            raise RecordError(f"ruch {ply} poza partią ({len(self.moves)} ruchów)")
+        board = Board(self.size)
+        last = len(self.moves) - 1
+        for turn, m in enumerate(self.moves[:ply]):
+            if verify and not board.is_empty(m):
+                raise RecordError(f"ruch {turn + 1}: pole {m} zajęte albo poza planszą")
+            board.make(m, turn % 3)
+            if verify and board.triplet_at(m) and (turn != last or self.result not in (FIRST_LOST, SECOND_LOST)):
+                raise RecordError(f"ruch {turn + 1}: tęczowy ciąg przed końcem partii")
+        if verify and ply == len(self.moves):
+            self.verify_result(board)
+        return board
+
+    def verify_result(self, board):
+        if self.result in (FIRST_LOST, SECOND_LOST):
+            if not self.moves or not board.triplet_at(self.moves[-1]):
+                raise RecordError("zapisana przegrana bez tęczowego ciągu")
+            if result_of(self.moves, True) != self.result:
+                raise RecordError("przegrana przypisana złemu graczowi")
+        elif self.result == DRAW and board.empty_mask():
+            raise RecordError("remis przy niepełnej planszy")
+
+    def positions(self):
+        # Kolejne pozycje partii (ply, plansza, następny ruch) na jednej planszy — bez kopiowania.
+        board = Board(self.size)
+        for turn, m in enumerate(self.moves):
+            yield turn, board, m
+            board.make(m, turn % 3)
+
+
+class RecordWriter:
+    # Strumieniowy zapis: partie trafiają do bufora bloku, a pełny blok jest kompresowany i dopisywany do pliku.
+    # W pamięci jest najwyżej jeden blok (block_size bajtów przed kompresją).
+
+    def __init__(self, path, block_size=BLOCK_SIZE, level=6):
+        self.block_size = block_size
+        self.level = level
+        self.buffer = bytearray()
+        self.pending = 0
+        self.games = 0
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            # urwany ostatni blok jest obcinany, żeby nowe bloki nie trafiły za niepoprawne dane
+            with open(path, "r+b") as f:
+                check_header(f, path)
+                blocks, end = scan_blocks(f)
+                f.truncate(end)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+
+    def write(self, size, moves, result, config=None):
+        body = bytearray()
+        GameRecord(size, moves, result, config).encode(body)
+        write_varint(self.buffer, len(body))
+        self.buffer += body
+        self.pending += 1
+        self.games += 1
+        if len(self.buffer) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        data = zlib.compress(self.buffer, self.level)
+        self.file.write(BLOCK.pack(len(data), len(self.buffer), self.pending, zlib.crc32(self.buffer)))
+        self.file.write(data)
+        self.file.flush()
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordReader:
+    # Indeks bloków powstaje z samych nagłówków, więc game(i) rozpakowuje tylko jeden blok.
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            check_header(self.file, path)
+        except RecordError:
+            self.file.close()
+            raise
+        self.blocks, end = scan_blocks(self.file)
+        self.truncated = end != os.fstat(self.file.fileno()).st_size
+        self.count = self.blocks[-1][1] + self.blocks[-1][2] if self.blocks else 0
+        self.cached = None
+
+    def __len__(self):
+        return self.count
+
+    def read_block(self, index):
+        if self.cached is not None and self.cached[0] == index:
+            return self.cached[1:]
+        offset, first, count = self.blocks[index]
+        self.file.seek(offset)
+        compressed, raw, count, crc = BLOCK.unpack(self.file.read(BLOCK.size))
+        data = zlib.decompress(self.file.read(compressed))
+        if len(data) != raw or zlib.crc32(data) != crc:
+            raise RecordError(f"blok {index}: uszkodzone dane")
+        # początki partii w bloku: skoki po prefiksach długości, bez dekodowania ruchów
+        starts = []
+        pos = 0
+        for _ in range(count):
+            length, pos = read_varint(data, pos)
+            starts.append(pos)
+            pos += length
+        self.cached = (index, data, starts)
+        return data, starts
+
+    def block_games(self, index):
+        data, starts = self.read_block(index)
+        return [GameRecord.decode(data, start)[0] for start in starts]
+
+    def game(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        lo, hi = 0, len(self.blocks) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.blocks[mid][1] <= i:
+                lo = mid
+            else:
+                hi = mid - 1
+        data, starts = self.read_block(lo)
+        return GameRecord.decode(data, starts[i - self.blocks[lo][1]])[0]
+
+    def __iter__(self):
+        for index in range(len(self.blocks)):
+            yield from self.block_games(index)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render(board):
+    return " ".join("." if board[i] is None else "RGB"[board[i]] for i in range(1, board.size + 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zapisy partii: podsumowanie, podgląd i weryfikacja.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="liczba partii, bloków i stopień kompresji")
+    info.add_argument("path")
+    show = sub.add_parser("show", help="pokaż partię (opcjonalnie pozycję po --ply ruchach)")
+    show.add_argument("path")
+    show.add_argument("index", type=int)
+    show.add_argument("--ply", type=int)
+    verify = sub.add_parser("verify", help="odtwórz i sprawdź wszystkie partie")
+    verify.add_argument("path")
+    args = parser.parse_args(argv)
+
+    with RecordReader(args.path) as reader:
+        if args.command == "info":
+            size = os.path.getsize(args.path)
+            moves = sum(len(game.moves) for game in reader)
+            print(f"{len(reader)} partii, {moves} ruchów, {len(reader.blocks)} bloków, {size} B "
+                  f"({size / max(1, moves):.2f} B/ruch){', urwany ostatni blok' if reader.truncated else ''}")
+        elif args.command == "show":
+            game = reader.game(args.index)
+            print(game, game.config or "")
+            print("ruchy:", " ".join(map(str, game.moves)))
+            print(render(game.replay(args.ply)))
+        else:
+            bad = 0
+            for i, game in enumerate(reader):
+                try:
+                    game.replay()
+                except RecordError as e:
+                    bad += 1
+                    print(f"partia {i}: {e}")
+            print(f"{len(reader) - bad}/{len(reader)} partii poprawnych")
+            return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .ai import AI_MODES, choose_move
+from .forbidden import IndexedBoard
+from .parallel_mcts import default_workers
+
+# Protokół: jeden obiekt JSON na linię w obie strony.
+#   {"op": "new", "n": 5, "ai": "mcts", "time": 0.2, "first": "human"}  -> {"ok": true, "session": 1, ...}
+#   {"op": "move", "session": 1, "pos": 7}                               -> ruch gracza i odpowiedź komputera
+#   {"op": "state", "session": 1} / {"op": "close", "session": 1} / {"op": "metrics"}
+# Błędy: {"ok": false, "error": "..."}; przy pełnej kolejce silnika {"ok": false, "error": "busy"}.
+DEFAULT_TIME_LIMIT = 0.2
+# Zapas ponad czas ruchu na kolejkę i przesył, zanim serwer odpowie ruchem awaryjnym.
+DEADLINE_SLACK = 0.5
+MAX_N = 10000
+# Górne granice czasu ruchu i terminu z żądania: dłuższe są przycinane, żeby jedno żądanie nie zajęło procesu puli.
+MAX_TIME_LIMIT = 30.0
+MAX_DEADLINE = MAX_TIME_LIMIT + DEADLINE_SLACK
+LATENCY_WINDOW = 2000
+LINE_LIMIT = 1 << 20
+
+
+def compute_move(size, moves, ai_mode, iterations, time_limit, deadline):
+    # Wykonywane w procesie puli. Plansza odtwarzana z listy ruchów; deadline to czas ścienny (time.time()),
+    # po którym wynik nie jest już potrzebny — zadanie, które za długo czekało w kolejce, nic nie liczy.
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return None
+    board = IndexedBoard(size)
+    for turn, m in enumerate(moves):
+        board.make(m, turn % 3)
+    if time_limit is None or time_limit > remaining:
+        time_limit = remaining
+    return choose_move(board, len(moves), ai_mode, iterations, time_limit)
+
+
+def parse_seconds(value, name, limit):
+    seconds = float(value)
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"{name} musi być skończoną liczbą dodatnią")
+    return min(seconds, limit)
+
+
+def fallback_move(board, turn):
+    # Ruch awaryjny po przekroczeniu terminu: losowe pole bezpieczne, bez przeszukiwania.
+    return random.choice(board.safe_cells(turn % 3) or board.empty_cells())
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counters = dict.fromkeys(
+            ("connections", "requests", "errors", "sessions_opened", "games_finished", "ai_moves", "busy",
+             "deadline_fallbacks", "worker_errors"), 0)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.finished = deque(maxlen=LATENCY_WINDOW)
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def record_move(self, latency):
+        self.counters["ai_moves"] += 1
+        self.latencies.append(latency)
+        self.finished.append(time.perf_counter())
+
+    def snapshot(self, active_sessions, pending):
+        now = time.perf_counter()
+        latencies = sorted(self.latencies)
+        recent = [t for t in self.finished if now - t <= 10.0]
+        result = dict(self.counters)
+        result.update(
+            uptime=now - self.started,
+            active_sessions=active_sessions,
+            pending=pending,
+            moves_per_s=len(recent) / min(10.0, now - self.started) if now > self.started else 0.0,
+        )
+        for q in (50, 95, 99):
+            result[f"latency_p{q}_ms"] = latencies[min(len(latencies) - 1, len(latencies) * q // 100)] * 1000 \
+                if latencies else None
+        return result
+
+
+class Session:
+    __slots__ = ('id', 'board', 'moves', 'ai_mode', 'iterations', 'time_limit', 'human', 'result', 'triplet')
+
+    def __init__(self, session_id, size, ai_mode, iterations, time_limit, human):
+        self.id = session_id
+        self.board = IndexedBoard(size)
+        self.moves = []
+        self.ai_mode = ai_mode
+        self.iterations = iterations
+        self.time_limit = time_limit
+        # parzystość tur gracza: 0 — człowiek zaczyna
+        self.human = human
+        self.result = None
+        self.triplet = None
+
+    @property
+    def turn(self):
+        return len(self.moves)
+
+    def play(self, pos):
+        # Wykonuje ruch; zwraca True, jeśli zakończył partię.
+        self.board.make(pos, self.turn % 3)
+        self.moves.append(pos)
+        triplet = self.board.triplet_at(pos)
+        if triplet:
+            human_moved = (self.turn - 1) % 2 == self.human
+            self.result = "loss" if human_moved else "win"
+            self.triplet = list(triplet)
+        elif not self.board.empty_mask():
+            self.result = "draw"
+        return self.result is not None
+
+    def state(self, moves=False):
+        # Pełna lista ruchów tylko na żądanie ("state"), żeby odpowiedź na ruch nie rosła z długością partii.
+        state = {"session": self.id, "size": self.board.size, "turn": self.turn, "result": self.result,
+                 "triplet": self.triplet}
+        if moves:
+            state["moves"] = self.moves
+        return state
+
+
+class GameServer:
+    # Wiele sesji gry w jednej pętli asyncio; ruchy komputera liczy wspólna pula procesów.
+    # Sesja należy do połączenia, które ją otworzyło, a żądania jednego połączenia obsługiwane są po kolei.
+    # Najwyżej max_pending zadań czeka na pulę — kolejne żądania dostają od razu "busy" (backpressure).
+
+    def __init__(self, workers=None, max_pending=None, executor=None):
+        self.workers = workers or default_workers()
+        self.max_pending = max_pending if max_pending is not None else 4 * self.workers
+        self.executor = executor
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.pending = 0
+        self.metrics = Metrics()
+        self.server = None
+        self.connections = set()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        self.server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for task in self.connections:
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def handle(self, reader, writer):
+        self.metrics.count("connections")
+        task = asyncio.current_task()
+        self.connections.add(task)
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.metrics.count("requests")
+                try:
+                    request = json.loads(line)
+                    response = await self.dispatch(request, owned)
+                except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+                    response = {"ok": False, "error": str(e) or type(e).__name__}
+                if not response.get("ok"):
+                    self.metrics.count("errors")
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # zerwane połączenie albo zamykanie serwera; sesje połączenia znikają razem z nim
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            self.connections.discard(task)
+            writer.close()
+
+    async def dispatch(self, request, owned):
+        op = request.get("op")
+        if op == "metrics":
+            return {"ok": True, "metrics": self.metrics.snapshot(len(self.sessions), self.pending)}
+        if op == "new":
+            return await self.new_session(request, owned)
+        if op not in ("state", "close", "move"):
+            raise ValueError(f"nieznana operacja: {op!r}")
+        session = self.sessions.get(request.get("session"))
+        if session is None or session.id not in owned:
+            raise ValueError("nieznana sesja")
+        if op == "state":
+            return {"ok": True, **session.state(moves=True)}
+        if op == "close":
+            owned.discard(session.id)
+            del self.sessions[session.id]
+            return {"ok": True}
+        return await self.player_move(session, request)
+
+    async def new_session(self, request, owned):
+        n = int(request.get("n", 3))
+        ai_mode = request.get("ai", "mcts")
+        if not 1 <= n <= MAX_N:
+            raise ValueError(f"n musi być z przedziału 1..{MAX_N}")
+        if ai_mode not in AI_MODES:
+            raise ValueError(f"nieznany tryb AI: {ai_mode!r}")
+        iterations = request.get("iterations")
+        if iterations is not None:
+            iterations = int(iterations)
+            if iterations < 1:
+                raise ValueError("iterations musi być dodatnie")
+        time_limit = parse_seconds(request.get("time", DEFAULT_TIME_LIMIT), "time", MAX_TIME_LIMIT) \
+            if iterations is None else None
+        human = 0 if request.get("first", "human") == "human" else 1
+        if human == 1 and self.overloaded():
+            return {"ok": False, "error": "busy"}
+        session = Session(next(self.ids), 3 * n, ai_mode, iterations, time_limit, human)
+        deadline_s = self.deadline(session, request)
+        self.sessions[session.id] = session
+        owned.add(session.id)
+        self.metrics.count("sessions_opened")
+        response = {"ok": True, **session.state()}
+        if human == 1:
+            response.update(await self.computer_move(session, deadline_s))
+        return response
+
+    async def player_move(self, session, request):
+        if session.result is not None:
+            raise ValueError("partia zakończona")
+        pos = int(request["pos"])
+        if not session.board.is_empty(pos):
+            raise ValueError(f"pole {pos} jest zajęte albo poza planszą")
+        # wszystko, co może się nie udać, sprawdzane przed ruchem gracza — błąd nie zostawia sesji w połowie tury
+        deadline_s = self.deadline(session, request)
+        if self.overloaded():
+            return {"ok": False, "error": "busy"}
+        if session.play(pos):
+            self.metrics.count("games_finished")
+            return {"ok": True, **session.state()}
+        return {"ok": True, **session.state(), **await self.computer_move(session, deadline_s)}
+
+    def deadline(self, session, request):
+        budget = session.time_limit if session.time_limit is not None else DEFAULT_TIME_LIMIT
+        return parse_seconds(request.get("deadline", budget + DEADLINE_SLACK), "deadline", MAX_DEADLINE)
+
+    def overloaded(self):
+        # Sprawdzane przed zmianą stanu sesji: odrzucone żądanie można po prostu ponowić.
+        if self.pending >= self.max_pending:
+            self.metrics.count("busy")
+            return True
+        return False
+
+    async def computer_move(self, session, deadline_s):
+        # Ruch gracza jest już na planszy, więc każda porażka puli kończy się ruchem awaryjnym, nie błędem.
+        deadline = time.time() + deadline_s
+        start = time.perf_counter()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, compute_move, session.board.size, list(session.moves),
+                                          session.ai_mode, session.iterations, session.time_limit, deadline)
+            move = await asyncio.wait_for(future, deadline_s)
+        except asyncio.TimeoutError:
+            move = None
+        except Exception:
+            self.metrics.count("worker_errors")
+            move = None
+        finally:
+            self.pending -= 1
+        fallback = move is None
+        if fallback:
+            self.metrics.count("deadline_fallbacks")
+            move = fallback_move(session.board, session.turn)
+        self.metrics.record_move(time.perf_counter() - start)
+        if session.play(move):
+            self.metrics.count("games_finished")
+        return {**session.state(), "ai_move": move, "fallback": fallback}
+
+
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--queue", type=int, help="maksymalna liczba ruchów czekających na pulę (domyślnie 4 × workers)")
+
+
+def run(args):
+    async def serve():
+        server = GameServer(args.workers, args.queue)
+        port = await server.start(args.host, args.port)
+        print(f"Serwer gry na {args.host}:{port}, {server.workers} procesów, kolejka {server.max_pending}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serwer wielu partii naraz (JSON-lines po TCP) ze wspólną pulą silników.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import time
+
+from .bitboard import bits_to_cells
+from .zobrist import TranspositionTable
+
+EXACT, LOWER, UPPER = 0, 1, 2
+# Od tej liczby pól limit czasu sprawdzany jest także przy generowaniu każdego ruchu.
+LARGE_BOARD = 256
+
+
+class SearchAborted(Exception):
+    pass
+
+
+class Solver:
+    # Negamax z cięciami alfa-beta i pogłębianiem iteracyjnym.
+    # Wartości z perspektywy gracza na ruchu: 1 = wygrana, 0 = remis, -1 = przegrana.
+    # Wpisy w tablicy: (głębokość, wartość, flaga, ruch w orientacji kanonicznej);
+    # głębokość równa liczbie pustych pól oznacza poddrzewo przeszukane do końca gry.
+    def __init__(self, table=None, max_nodes=None, time_limit=None, should_stop=None):
+        self.table = table if table is not None else TranspositionTable()
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.should_stop = should_stop
+        # on_solved(board, turn, value, move) — wywoływane dla każdej pozycji z dokładnie policzoną wartością
+        self.on_solved = None
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = None
+        self.root_move = None
+
+    def solve(self, board, turn):
+        # Zwraca (wartość, najlepszy ruch, czy wynik jest dokładny).
+        board = board.copy()
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        empty = board.empty_mask()
+        if not empty:
+            return 0, None, True
+        safe = board.safe_mask(turn % 3)
+        if not safe:
+            return -1, bits_to_cells(empty)[0], True
+
+        result = (0, bits_to_cells(safe)[0], False)
+        full = empty.bit_count()
+        for depth in range(1, full + 1):
+            self.depth = depth
+            self.root_move = None
+            try:
+                value, complete = self.negamax(board, turn, depth, -1, 1, safe, full, True)
+            except SearchAborted:
+                break
+            result = (value, self.root_move or result[1], complete)
+            if complete:
+                break
+        return result
+
+    def negamax(self, board, turn, depth, alpha, beta, safe, full, root=False):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchAborted
+        self.check_time()
+
+        if not safe:
+            return -1, True  # każdy ruch tworzy tęczowy ciąg
+        if depth == 0:
+            return 0, False
+
+        key = board.canonical_key()
+        flipped = board.key != key
+        size = board.size
+        alpha0 = alpha
+        tt_move = None
+        entry = self.table.get(key)
+        if entry is not None:
+            e_depth, e_value, e_flag, e_move = entry
+            if e_move is not None:
+                tt_move = size + 1 - e_move if flipped else e_move
+            if e_depth >= depth and not root:
+                if e_flag == EXACT:
+                    return e_value, e_depth == full
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_value)
+                else:
+                    beta = min(beta, e_value)
+                if alpha >= beta:
+                    return e_value, e_depth == full
+
+        # Porządkowanie ruchów: najpierw ruch z tablicy, potem te, które zostawiają rywalowi najmniej bezpiecznych odpowiedzi.
+        next_color = (turn + 1) % 3
+        children = []
+        for m in bits_to_cells(safe):
+            if size > LARGE_BOARD:
+                self.check_time()
+            board.make(m, turn % 3)
+            child_safe = board.safe_mask(next_color)
+            has_empty = board.empty_mask() != 0
+            board.undo(m)
+            if not child_safe and has_empty:
+                # rywal musi utworzyć tęczowy ciąg
+                self.store(key, flipped, size, full, 1, EXACT, m)
+                if self.on_solved is not None:
+                    self.on_solved(board, turn, 1, m)
+                if root:
+                    self.root_move = m
+                return 1, True
+            children.append((m != tt_move, child_safe.bit_count(), m, child_safe, has_empty))
+        children.sort()
+
+        best, best_move, complete = -2, None, True
+        for _, _, m, child_safe, has_empty in children:
+            board.make(m, turn % 3)
+            if has_empty:
+                value, child_complete = self.negamax(board, turn + 1, depth - 1, -beta, -alpha, child_safe, full - 1)
+                value = -value
+            else:
+                value, child_complete = 0, True  # remis: plansza zapełniona
+            board.undo(m)
+            complete = complete and child_complete
+            if value > best:
+                best, best_move = value, m
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(key, flipped, size, full if complete else depth, best, flag, best_move)
+        if self.on_solved is not None and complete and (flag == EXACT or best == 1 or best == -1):
+            self.on_solved(board, turn, best, best_move)
+        if root:
+            self.root_move = best_move
+        return best, complete
+
+    def check_time(self):
+        # Na dużej planszy jeden węzeł kosztuje milisekundy, więc limit nie może czekać na kolejne węzły.
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted
+        if self.should_stop is not None and self.should_stop():
+            raise SearchAborted
+
+    def store(self, key, flipped, size, depth, value, flag, move):
+        if flipped and move is not None:
+            move = size + 1 - move
+        self.table.put(key, (depth, value, flag, move))
+
+
+def solve(board, turn, max_nodes=None, time_limit=None, table=None):
+    return Solver(table, max_nodes, time_limit).solve(board, turn)
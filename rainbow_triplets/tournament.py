@@ -0,0 +1,247 @@
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .ai import AI_MODES, EVAL_MODE, choose_move, new_eval_engine, new_mcts_engine
+from .forbidden import IndexedBoard
+from .heuristic import HeuristicEngine
+from .parallel_mcts import default_workers
+from .records import RecordWriter, result_of
+
+
+def parse_engine(spec):
+    # "tryb[:budżet]": budżet to liczba iteracji MCTS ("mcts:500") albo czas w sekundach ("mcts:0.5s");
+    # dla heurystyki liczba to głębokość ("heurystyczny:2" — z oceną odpowiedzi rywala).
+    mode, _, budget = spec.partition(":")
+    if mode not in AI_MODES:
+        raise ValueError(f"nieznany tryb AI: {mode!r} (dostępne: {', '.join(AI_MODES)})")
+    iterations = time_limit = None
+    if budget.endswith("s"):
+        time_limit = float(budget[:-1])
+    elif budget:
+        iterations = int(budget)
+    return mode, iterations, time_limit
+
+
+def new_engine(mode, iterations, weights=None):
+    # Silnik trzymany przez całą partię i przesuwany o każdy ruch (drzewo MCTS, cache heurystyki).
+    if mode == "mcts":
+        return new_mcts_engine()
+    if mode == EVAL_MODE:
+        return new_eval_engine(weights)
+    if mode == "heurystyczny":
+        return HeuristicEngine(lookahead=iterations or 1)
+    return None
+
+
+def play_game(n, specs, seed, weights=None):
+    # specs[0] zaczyna; zwraca (wynik specs[0]: 1 wygrana, 0 przegrana, 0.5 remis; lista ruchów).
+    random.seed(seed)
+    players = [parse_engine(spec) for spec in specs]
+    engines = [new_engine(mode, iterations, weights) for mode, iterations, _ in players]
+    board = IndexedBoard(3 * n)
+    moves = []
+    turn = 0
+    while board.empty_mask():
+        side = turn % 2
+        mode, iterations, time_limit = players[side]
+        move = choose_move(board, turn, mode, iterations, time_limit, engine=engines[side])
+        board.make(move, turn % 3)
+        moves.append(move)
+        for engine in engines:
+            if engine is not None:
+                engine.advance(move)
+        turn += 1
+        if board.triplet_at(move):
+            return (0.0 if side == 0 else 1.0), moves
+    return 0.5, moves
+
+
+def score_to_elo(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_to_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+class PairStats:
+    # Wyniki pary z perspektywy pierwszej konfiguracji.
+
+    def __init__(self):
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def add(self, score):
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def moments(self, prior=0.0):
+        # Średni wynik i wariancja wyniku pojedynczej partii (model trójmianowy: wygrana/remis/przegrana).
+        w, d, l = self.wins + prior, self.draws + prior, self.losses + prior
+        total = w + d + l
+        if not total:
+            return 0.5, 0.0
+        mean = (w + 0.5 * d) / total
+        var = (w * (1 - mean) ** 2 + d * (0.5 - mean) ** 2 + l * mean ** 2) / total
+        return mean, var
+
+    def score(self):
+        return self.moments()[0]
+
+    def elo(self):
+        return score_to_elo(self.score())
+
+    def elo_interval(self, z=1.96):
+        mean, var = self.moments()
+        if not self.games:
+            return -math.inf, math.inf
+        margin = z * math.sqrt(var / self.games)
+        return score_to_elo(mean - margin), score_to_elo(mean + margin)
+
+    def llr(self, elo0, elo1):
+        # Uogólniony SPRT (przybliżenie normalne). Pseudoliczności po 0.5 w każdej kategorii
+        # zapobiegają zerowej wariancji, gdy jedna strona wygrywa wszystkie partie.
+        mean, var = self.moments(prior=0.5)
+        s0, s1 = elo_to_score(elo0), elo_to_score(elo1)
+        return self.games * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def run_pair(executor, n, first, second, games, seed, in_flight, sprt=None, on_result=None, weights=None):
+    # Gra do `games` partii z naprzemiennym pierwszym graczem; zwraca (PairStats, werdykt SPRT lub None).
+    # sprt = (elo0, elo1, alpha, beta): po każdej partii sprawdzamy LLR i przerywamy, gdy wynik jest pewny.
+    stats = PairStats()
+    bounds = sprt_bounds(sprt[2], sprt[3]) if sprt is not None else None
+    pending = {}
+    next_game = 0
+    verdict = None
+    while next_game < games or pending:
+        while next_game < games and len(pending) < in_flight and verdict is None:
+            specs = (first, second) if next_game % 2 == 0 else (second, first)
+            future = executor.submit(play_game, n, specs, seed + next_game, weights)
+            pending[future] = next_game
+            next_game += 1
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            game = pending.pop(future)
+            score, moves = future.result()
+            if game % 2 == 1:
+                score = 1 - score
+            stats.add(score)
+            if on_result is not None:
+                on_result(game, score, moves, stats)
+        if bounds is not None and verdict is None:
+            llr = stats.llr(sprt[0], sprt[1])
+            if llr <= bounds[0]:
+                verdict = "H0"
+            elif llr >= bounds[1]:
+                verdict = "H1"
+            if verdict is not None:
+                for future in pending:
+                    future.cancel()
+                pending = {f: g for f, g in pending.items() if not f.cancelled()}
+    return stats, verdict
+
+
+def format_elo(value):
+    return f"{value:+.0f}" if math.isfinite(value) else ("+inf" if value > 0 else "-inf")
+
+
+def summary(first, second, stats, verdict):
+    low, high = stats.elo_interval()
+    text = (f"{first} vs {second}: +{stats.wins} ={stats.draws} -{stats.losses} ({stats.games} partii), "
+            f"wynik {stats.score():.3f}, Elo {format_elo(stats.elo())} [{format_elo(low)}, {format_elo(high)}]")
+    if verdict is not None:
+        text += f", SPRT: {verdict}"
+    return text
+
+
+def add_arguments(parser):
+    parser.add_argument("engines", nargs="+",
+                        help="konfiguracje tryb[:iteracje|:sekundy s], np. losowy heurystyczny mcts:300 mcts:0.2s "
+                             f"{EVAL_MODE}:0.2s")
+    parser.add_argument("--n", type=int, default=5, help="plansza ma 3n pozycji")
+    parser.add_argument("--games", type=int, default=1000, help="maksymalna liczba partii na parę")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"),
+                        help="przerwij parę, gdy SPRT rozstrzygnie H0: Elo=ELO0 przeciw H1: Elo=ELO1")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--report", type=int, default=100, help="co ile partii wypisać stan pary")
+    parser.add_argument("--out", help="dopisuj wynik każdej partii do pliku JSON-lines")
+    parser.add_argument("--record", help="dopisuj pełne partie do pliku zapisu (records.py)")
+    parser.add_argument("--weights", help=f"{EVAL_MODE}: plik modelu sieci (domyślnie evaluator.npz)")
+
+
+def run(args):
+    for spec in args.engines:
+        try:
+            parse_engine(spec)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if len(args.engines) < 2:
+        raise SystemExit("potrzebne są co najmniej dwie konfiguracje")
+    pairs = list(itertools.combinations(args.engines, 2))
+    sprt = (args.sprt[0], args.sprt[1], args.alpha, args.beta) if args.sprt else None
+    out = open(args.out, "a") if args.out else None
+    recorder = RecordWriter(args.record) if args.record else None
+    try:
+        with ProcessPoolExecutor(args.workers) as executor:
+            for index, (first, second) in enumerate(pairs):
+                seed = args.seed + index * 1_000_003
+
+                def on_result(game, score, moves, stats, first=first, second=second, seed=seed):
+                    starts, other = (first, second) if game % 2 == 0 else (second, first)
+                    if out is not None:
+                        out.write(json.dumps({"first": first, "second": second, "game": game, "starts": starts,
+                                              "score": score, "moves": len(moves)}) + "\n")
+                        out.flush()
+                    if recorder is not None:
+                        recorder.write(3 * args.n, moves, result_of(moves, score != 0.5),
+                                       {"first": starts, "second": other, "seed": seed + game})
+                    if stats.games % args.report == 0:
+                        print(summary(first, second, stats, None), flush=True)
+
+                stats, verdict = run_pair(executor, args.n, first, second, args.games, seed, 2 * args.workers,
+                                          sprt, on_result, args.weights)
+                print(summary(first, second, stats, verdict), flush=True)
+    finally:
+        if out is not None:
+            out.close()
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Turniej AI kontra AI na puli procesów, z Elo i SPRT.")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+MASK64 = (1 << 64) - 1
+
+_tables = {}
+
+
+def splitmix64(x):
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def zobrist_table(size):
+    # Klucz pola (pos, kolor) pod indeksem 3 * pos + kolor; deterministyczny, więc stały między uruchomieniami.
+    table = _tables.get(size)
+    if table is None:
+        table = [splitmix64(i + 1) for i in range(3 * (size + 2))]
+        _tables[size] = table
+    return table
+
+
+class TranspositionTable:
+    # Ograniczona tablica transpozycji z usuwaniem najdawniej używanych wpisów (LRU).
+    def __init__(self, capacity=1 << 20):
+        self.capacity = capacity
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return {
+            "entries": len(self.data),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
@@ -0,0 +1,64 @@
+from rainbow_triplets.analytics import Counters, analyse, explore
+from rainbow_triplets.bitboard import Board
+from rainbow_triplets.forbidden import IndexedBoard
+
+
+def enumerate_orders(board, turn, depth, draws, losses):
+    # Wszystkie kolejności ruchów wprost, bez pamięci i bez indeksu pól zakazanych.
+    empty = board.empty_cells()
+    for m in empty:
+        board.make(m, turn % 3)
+        if board.triplet_at(m):
+            losses[depth] += 1
+        elif len(empty) == 1:
+            draws[0] += 1
+        else:
+            enumerate_orders(board, turn + 1, depth + 1, draws, losses)
+        board.undo(m)
+
+
+def perfect_value(board, turn):
+    empty = board.empty_cells()
+    if not empty:
+        return 0
+    best = -1
+    for m in empty:
+        board.make(m, turn % 3)
+        value = -1 if board.triplet_at(m) else -perfect_value(board, turn + 1)
+        board.undo(m)
+        best = max(best, value)
+    return best
+
+
+def reference(size, moves=()):
+    board = Board(size)
+    for turn, m in enumerate(moves):
+        board.make(m, turn % 3)
+    draws, losses = [0], [0] * (size - len(moves))
+    enumerate_orders(board, len(moves), 0, draws, losses)
+    return perfect_value(board, len(moves)), draws[0], tuple(losses)
+
+
+def test_explore_matches_enumeration():
+    for size in (3, 6, 9):
+        assert explore(IndexedBoard(size), 0, {}, Counters()) == reference(size)
+    board = IndexedBoard(9)
+    board.make(2, 0)
+    board.make(5, 1)
+    assert explore(board, 2, {}, Counters()) == reference(9, (2, 5))
+
+
+def test_analyse_and_resume_match_enumeration(tmp_path):
+    checkpoint = tmp_path / "n3.jsonl"
+    for n in (2, 3):
+        root, first_moves, stats = analyse(3 * n, workers=1, split=1)
+        assert root == reference(3 * n)
+        for m, result in first_moves.items():
+            assert result == reference(3 * n, (m,))
+    root, _, stats = analyse(9, workers=1, split=2, checkpoint=str(checkpoint))
+    # przerwany zapis: ostatni wiersz urwany w połowie
+    text = checkpoint.read_text()
+    checkpoint.write_text(text[:len(text) - 5])
+    resumed, _, resumed_stats = analyse(9, workers=1, split=2, checkpoint=str(checkpoint))
+    assert resumed == root == reference(9)
+    assert resumed_stats["resumed"] == stats["tasks"] - 1
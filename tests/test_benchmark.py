@@ -0,0 +1,23 @@
+from rainbow_triplets.benchmark import compare
+
+
+def report(samples, repeats, **row):
+    return {"meta": {"samples": samples, "repeats": repeats}, "results": {"10": row}}
+
+
+def test_tail_percentiles_need_enough_samples():
+    base = {"rollouts_per_s": 1000.0, "mcts_p50_ms": 10.0, "mcts_p95_ms": 20.0, "mcts_p99_ms": 30.0}
+    slow = {"rollouts_per_s": 1000.0, "mcts_p50_ms": 10.0, "mcts_p95_ms": 40.0, "mcts_p99_ms": 90.0}
+    # 10 x 3 próbki: p95 i p99 to szum, nie regresja
+    assert compare(report(10, 3, **slow), report(10, 3, **base), 0.2) == []
+    metrics = [r[1] for r in compare(report(100, 3, **slow), report(100, 3, **base), 0.2)]
+    assert metrics == ["mcts_p95_ms"]
+    metrics = [r[1] for r in compare(report(500, 2, **slow), report(1000, 1, **base), 0.2)]
+    assert metrics == ["mcts_p95_ms", "mcts_p99_ms"]
+
+
+def test_median_and_throughput_are_always_compared():
+    base = {"rollouts_per_s": 1000.0, "mcts_p50_ms": 10.0}
+    worse = {"rollouts_per_s": 700.0, "mcts_p50_ms": 13.0}
+    regressions = compare(report(5, 1, **worse), {"meta": {"samples": 5}, "results": {"10": base}}, 0.2)
+    assert [(r[1], round(r[4], 2)) for r in regressions] == [("rollouts_per_s", -0.3), ("mcts_p50_ms", 0.3)]
@@ -0,0 +1,13 @@
+import pytest
+
+from rainbow_triplets import cli
+
+
+@pytest.mark.parametrize("argv", [
+    ["batch", "--n", "4", "--time", "0.05", "--batch", "64", "--tree-batch", "16"],
+    ["rave", "--n", "2", "--games", "2", "--budgets", "10", "--ratio", "2"],
+    ["speedup", "--n", "4", "--time", "0.05", "--workers", "1"],
+])
+def test_benchmark_subcommands_run(argv, capsys):
+    assert cli.main(argv) == 0
+    assert len(capsys.readouterr().out.splitlines()) >= 2
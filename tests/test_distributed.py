@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+
+from rainbow_triplets.distributed import coordinate
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.solver import Solver
+
+
+def solve(n, moves):
+    board = IndexedBoard(3 * n)
+    for turn, m in enumerate(moves):
+        board.make(m, turn % 3)
+    return Solver().solve(board, len(moves))
+
+
+def test_local_workers_reissue_killed_task():
+    # Dwa procesy pracowników na localhost; jeden zabity zaraz po tym, jak dostał zadanie.
+    n, moves = 4, [1]
+    args = argparse.Namespace(n=n, moves=moves, split=2, host="127.0.0.1", port=0)
+    coordinator = asyncio.run(coordinate(args, spawn=2, kill_after=0))
+    report = coordinator.report()
+    assert report["reissued"] >= 1
+    value, move, exact = solve(n, moves)
+    assert exact and report["value"] == value
+    # ruch koordynatora jest optymalny (przy kilku wygrywających może różnić się od ruchu solvera)
+    child_value, _, _ = solve(n, moves + [report["best"]])
+    assert -child_value == value
+
+
+def test_split_deeper_than_game_matches_solver():
+    for n, moves, split in ((3, [], 3), (4, [2, 5], 1)):
+        args = argparse.Namespace(n=n, moves=moves, split=split, host="127.0.0.1", port=0)
+        coordinator = asyncio.run(coordinate(args, spawn=1))
+        assert coordinator.report()["value"] == solve(n, moves)[0]
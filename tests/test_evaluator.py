@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from rainbow_triplets import evaluator
+from rainbow_triplets.ai import EVAL_MODE
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.tournament import play_game
+
+
+def test_eval_mode_plays_tournament_games(tmp_path):
+    weights = str(tmp_path / "model.npz")
+    evaluator.main(["train", "--games", "12", "--n", "4", "--epochs", "2", "--rollouts", "2", "--out", weights])
+    for seed in range(2):
+        score, moves = play_game(4, (f"{EVAL_MODE}:20", "mcts:20"), seed, weights)
+        assert score in (0.0, 0.5, 1.0)
+        board = IndexedBoard(12)
+        for turn, move in enumerate(moves):
+            assert board.is_empty(move)
+            board.make(move, turn % 3)
@@ -0,0 +1,59 @@
+import random
+
+from rainbow_triplets.bitboard import bits_to_cells
+from rainbow_triplets.forbidden import IndexedBoard
+
+
+def check_index(board):
+    # Indeks przyrostowy musi się zgadzać z maskami liczonymi od zera (Board.forbidden / safe_mask).
+    for color in range(3):
+        forbidden = [x for x in board.empty_cells() if board.counts[color][x]]
+        assert forbidden == bits_to_cells(board.forbidden(color))
+        assert board.safe[color] == board.safe_mask(color).bit_count()
+
+
+def test_make_and_undo_match_recomputed_masks():
+    rng = random.Random(0)
+    for size in (9, 20, 31):
+        board = IndexedBoard(size)
+        played = []
+        for _ in range(400):
+            empty = board.empty_cells()
+            if empty and (not played or rng.random() < 0.6):
+                m = rng.choice(empty)
+                board.make(m, rng.randrange(3))
+                played.append(m)
+            else:
+                # cofanie nie tylko ostatniego ruchu
+                board.undo(played.pop(rng.randrange(len(played))))
+            check_index(board)
+
+
+def test_undo_restores_empty_board():
+    rng = random.Random(1)
+    size = 24
+    board = IndexedBoard(size)
+    moves = rng.sample(range(1, size + 1), size)
+    for turn, m in enumerate(moves):
+        board.make(m, turn % 3)
+    for m in reversed(moves):
+        board.undo(m)
+    empty = IndexedBoard(size)
+    assert board.counts == empty.counts
+    assert board.safe == empty.safe
+    assert board.key == empty.key and board.occupied == 0
+
+
+def test_copy_and_from_board_are_independent():
+    rng = random.Random(2)
+    board = IndexedBoard(15)
+    for turn, m in enumerate(rng.sample(range(1, 16), 7)):
+        board.make(m, turn % 3)
+    rebuilt = IndexedBoard.from_board(board)
+    assert rebuilt.counts == board.counts and rebuilt.safe == board.safe
+    copy = board.copy()
+    m = copy.empty_cells()[0]
+    copy.make(m, 0)
+    check_index(copy)
+    check_index(board)
+    assert board.is_empty(m)
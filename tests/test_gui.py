@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from rainbow_triplets import gui
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.mcts import MCTS
+
+
+def test_search_worker_falls_back_when_the_engine_fails(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("silnik padł")
+
+    monkeypatch.setattr(gui, "choose_move", broken)
+    board = IndexedBoard(9)
+    for turn, pos in enumerate((0, 1)):
+        board.make(pos, turn % 3)
+    engine = MCTS()
+    engine.run(board, 2, iterations=50)
+    worker = gui.SearchWorker(board, 2, "mcts", iterations=50, engine=engine)
+    moves = []
+    worker.move_ready.connect(moves.append)
+    worker.run()
+    # kolor 2 nie może zagrać 2 (0,1,2 byłoby tęczowe), więc pierwsze bezpieczne pole to 3
+    assert moves == [3]
+    assert engine.root is None
+
+
+def test_game_window_options():
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    game = gui.RainbowTripletsGame(size=30, reply_delay_ms=1500, colors=("#2ecc71", "#e74c3c", "#3498db"),
+                                   columns=10, cell=50)
+    assert game.view.columns() == 10 and game.view.rows() == 3 and game.view.cell == 50
+    assert game.color_to_qcolor(0).name() == "#2ecc71"
+    assert game.reply_delay_ms == 1500
+    game.close()
+    assert app is not None
@@ -0,0 +1,49 @@
+import random
+
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.heuristic import HeuristicEngine, new_forbidden, reply_count
+
+
+def test_reply_count_matches_make_and_safe_count():
+    rng = random.Random(0)
+    for size in (12, 30):
+        for _ in range(20):
+            board = IndexedBoard(size)
+            for turn in range(rng.randrange(size - 1)):
+                board.make(rng.choice(board.empty_cells()), turn % 3)
+            for color in range(3):
+                nxt = (color + 1) % 3
+                for m in board.empty_cells():
+                    board.make(m, color)
+                    expected = board.safe_count(nxt)
+                    board.undo(m)
+                    assert reply_count(board, m, color) == expected
+
+
+def test_cache_stays_exact_across_advance():
+    # Po każdym ruchu partii każdy wpis cache musi równać się wartości policzonej od zera.
+    rng = random.Random(1)
+    for size in (15, 30, 45):
+        for game in range(4):
+            engine = HeuristicEngine(lookahead=1 + game % 2)
+            board = IndexedBoard(size)
+            turn = 0
+            while board.empty_mask():
+                move = engine.choose(board, turn)
+                # wypełnienie cache dla wszystkich kolorów, żeby advance miał co unieważniać
+                for color in range(3):
+                    for m in engine.board.empty_cells():
+                        engine.reply(engine.board, m, color)
+                if rng.random() < 0.3:
+                    move = rng.choice(board.empty_cells())
+                board.make(move, turn % 3)
+                engine.advance(move)
+                turn += 1
+                assert engine.board.key == board.key and engine.turn == turn
+                for color, cache in enumerate(engine.cache):
+                    for m, forbidden in cache.items():
+                        assert board.is_empty(m)
+                        assert forbidden == new_forbidden(board, m, color)
+                if board.triplet_at(move):
+                    break
+            assert engine.resets == 0
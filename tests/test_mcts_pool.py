@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.mcts import MCTS, count_nodes
+from rainbow_triplets.zobrist import TranspositionTable
+
+
+def test_prune_gives_up_until_the_root_changes():
+    # Korzeń i dwa liście: przycinanie nic nie zwolni, więc nie może być wołane w każdej iteracji.
+    engine = MCTS(smart_rollouts=True, widening=True, max_nodes=3)
+    calls = []
+    prune = engine.prune
+    engine.prune = lambda root: calls.append(root) or prune(root)
+    board = IndexedBoard(30)
+    move = engine.search(board, 0, iterations=500)
+    assert len(calls) == 1 and not engine.prunable
+    assert board.is_empty(move)
+    board.make(move, 0)
+    engine.advance(move)
+    assert engine.prunable
+
+
+def test_max_nodes_needs_room_for_a_child():
+    with pytest.raises(ValueError):
+        MCTS(max_nodes=1)
+
+
+def check_pool(engine):
+    # Każdy węzeł puli jest albo wolny, albo osiągalny z korzenia — nic nie ginie i nic nie jest liczone dwa razy.
+    live = count_nodes(engine.root)
+    assert live == engine.pool.in_use()
+    assert len(engine.pool.free) + live == engine.pool.capacity
+    assert len({id(node) for node in engine.pool.free}) == len(engine.pool.free)
+
+
+def test_pool_accounting_after_prune_and_advance():
+    random.seed(0)
+    for kwargs in ({}, {"table": TranspositionTable(1 << 12)}):
+        engine = MCTS(smart_rollouts=True, rave=True, widening=True, max_nodes=200, **kwargs)
+        board = IndexedBoard(45)
+        turn = 0
+        while board.empty_mask() and turn < 20:
+            move = engine.search(board, turn, iterations=600)
+            check_pool(engine)
+            freed = engine.prune(engine.root)
+            assert freed > 0 or not any(child.children for child in engine.root.children)
+            check_pool(engine)
+            board.make(move, turn % 3)
+            engine.advance(move)
+            check_pool(engine)
+            turn += 1
+            if board.triplet_at(move):
+                break
+        assert engine.pool.recycled > 0 and engine.pruned > 0
+
+
+def test_tiny_pool_still_returns_legal_moves():
+    random.seed(1)
+    for max_nodes in (2, 3, 5, 17):
+        engine = MCTS(smart_rollouts=True, rave=True, widening=True, max_nodes=max_nodes)
+        board = IndexedBoard(30)
+        for turn in range(12):
+            move = engine.search(board, turn, iterations=200)
+            assert board.is_empty(move)
+            check_pool(engine)
+            board.make(move, turn % 3)
+            engine.advance(move)
+            if board.triplet_at(move):
+                break
@@ -0,0 +1,85 @@
+import os
+import random
+
+import pytest
+
+from rainbow_triplets.forbidden import IndexedBoard
+from rainbow_triplets.records import (DRAW, UNFINISHED, GameRecord, RecordError, RecordReader,
+                                      RecordWriter, result_of)
+
+
+def random_game(rng, size):
+    board = IndexedBoard(size)
+    moves = []
+    while board.empty_mask():
+        m = rng.choice(board.safe_cells(len(moves) % 3) or board.empty_cells())
+        board.make(m, len(moves) % 3)
+        moves.append(m)
+        if board.triplet_at(m):
+            return moves, result_of(moves, True)
+    return moves, DRAW
+
+
+def sample_games(count, seed=0):
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        # rozmiary powyżej 127 sprawdzają wielobajtowe varinty
+        size = rng.choice((9, 30, 150, 300))
+        moves, result = random_game(rng, size)
+        config = {"ai": ["mcts", "heurystyczny"], "seed": i} if i % 3 else None
+        games.append((size, moves, result, config))
+    return games
+
+
+def as_tuple(record):
+    return record.size, record.moves, record.result, record.config
+
+
+def test_round_trip_across_blocks(tmp_path):
+    path = tmp_path / "games.rtgr"
+    games = sample_games(60)
+    with RecordWriter(path, block_size=2048) as writer:
+        for game in games:
+            writer.write(*game)
+    with RecordReader(path) as reader:
+        assert len(reader.blocks) > 1 and not reader.truncated
+        assert [as_tuple(r) for r in reader] == games
+        for i in random.Random(1).sample(range(len(games)), 20):
+            assert as_tuple(reader.game(i)) == games[i]
+        for record in reader:
+            record.replay()
+
+
+def test_truncated_block_is_skipped_and_overwritten(tmp_path):
+    path = tmp_path / "games.rtgr"
+    games = sample_games(40, seed=2)
+    with RecordWriter(path, block_size=1024) as writer:
+        for game in games:
+            writer.write(*game)
+    with RecordReader(path) as reader:
+        last_offset, last_first, _ = reader.blocks[-1]
+    # przerwany zapis: ostatni blok urwany w połowie
+    with open(path, "r+b") as f:
+        f.truncate((last_offset + os.path.getsize(path)) // 2)
+    with RecordReader(path) as reader:
+        assert reader.truncated and len(reader) == last_first
+        assert [as_tuple(r) for r in reader] == games[:last_first]
+    extra = sample_games(5, seed=3)
+    with RecordWriter(path) as writer:
+        for game in extra:
+            writer.write(*game)
+    with RecordReader(path) as reader:
+        assert not reader.truncated
+        assert [as_tuple(r) for r in reader] == games[:last_first] + extra
+
+
+def test_replay_rejects_inconsistent_records():
+    moves, result = random_game(random.Random(4), 30)
+    GameRecord(30, moves, result).replay()
+    GameRecord(30, moves[:-1], UNFINISHED).replay()
+    with pytest.raises(RecordError):
+        GameRecord(30, moves + [moves[0]], UNFINISHED).replay()
+    if result != DRAW:
+        with pytest.raises(RecordError):
+            GameRecord(30, moves, DRAW).replay()
@@ -0,0 +1,61 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from rainbow_triplets import server
+
+
+def run_session(requests, executor=None):
+    # Jedno połączenie z serwerem na wolnym porcie; zwraca odpowiedzi na kolejne żądania.
+    async def scenario():
+        game_server = server.GameServer(1, executor=executor or ThreadPoolExecutor(1))
+        port = await game_server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        try:
+            for request in requests:
+                if callable(request):
+                    request = request(responses)
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+        finally:
+            writer.close()
+            await game_server.close()
+        return responses
+
+    return asyncio.run(scenario())
+
+
+def test_rejects_non_finite_time_and_deadline():
+    responses = run_session([
+        {"op": "new", "n": 3, "ai": "losowy", "time": "inf"},
+        {"op": "new", "n": 3, "ai": "losowy", "time": "nan"},
+        {"op": "new", "n": 3, "ai": "losowy", "iterations": "50"},
+        lambda r: {"op": "move", "session": r[2]["session"], "pos": 1, "deadline": "inf"},
+        lambda r: {"op": "move", "session": r[2]["session"], "pos": 1e400},
+        lambda r: {"op": "state", "session": r[2]["session"]},
+    ])
+    assert [r["ok"] for r in responses] == [False, False, True, False, False, True]
+    # odrzucone żądania nie zmieniły sesji
+    assert responses[-1]["moves"] == []
+
+
+def test_huge_values_are_clamped():
+    responses = run_session([{"op": "new", "n": 3, "ai": "losowy", "time": 1e300}])
+    assert responses[0]["ok"]
+    assert server.parse_seconds(1e300, "deadline", server.MAX_DEADLINE) == server.MAX_DEADLINE
+
+
+def test_worker_error_answers_with_fallback(monkeypatch):
+    def broken(*args):
+        raise RuntimeError("silnik")
+
+    monkeypatch.setattr(server, "compute_move", broken)
+    responses = run_session([
+        {"op": "new", "n": 3, "ai": "mcts", "iterations": 50},
+        lambda r: {"op": "move", "session": r[0]["session"], "pos": 1},
+        lambda r: {"op": "state", "session": r[0]["session"]},
+    ])
+    assert responses[1]["ok"] and responses[1]["fallback"]
+    assert len(responses[2]["moves"]) == 2
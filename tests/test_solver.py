@@ -0,0 +1,62 @@
+import itertools
+import random
+
+from rainbow_triplets.bitboard import Board
+from rainbow_triplets.solver import Solver
+
+
+def brute_force(board, turn):
+    # Pełny minimaks po wszystkich pustych polach (także przegrywających), bez cięć i tablic.
+    empty = board.empty_cells()
+    if not empty:
+        return 0
+    best = -1
+    for m in empty:
+        board.make(m, turn % 3)
+        value = -1 if board.triplet_at(m) else -brute_force(board, turn + 1)
+        board.undo(m)
+        best = max(best, value)
+        if best == 1:
+            break
+    return best
+
+
+def check(board, turn):
+    value, move, exact = Solver().solve(board, turn)
+    assert exact and value == brute_force(board, turn)
+    if move is not None:
+        # zwrócony ruch osiąga zwróconą wartość
+        board.make(move, turn % 3)
+        reached = -1 if board.triplet_at(move) else -brute_force(board, turn + 1)
+        board.undo(move)
+        assert reached == value
+
+
+def test_empty_boards_match_brute_force():
+    for size in range(1, 11):
+        check(Board(size), 0)
+
+
+def test_openings_match_brute_force():
+    for size in (6, 9, 10):
+        for moves in itertools.permutations(range(1, size + 1), 2):
+            board = Board(size)
+            for turn, m in enumerate(moves):
+                board.make(m, turn % 3)
+            check(board, len(moves))
+
+
+def test_random_positions_match_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        size = rng.randrange(5, 11)
+        board = Board(size)
+        turn = 0
+        for _ in range(rng.randrange(size)):
+            m = rng.choice(board.empty_cells())
+            board.make(m, turn % 3)
+            if board.triplet_at(m):
+                board.undo(m)
+                break
+            turn += 1
+        check(board, turn)